@@ -1,120 +1,230 @@
 import streamlit as st
 import os
+import io
+import re
+import queue
 import json
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from auditor import AccessAuditor
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 
-def create_highlighted_image(base_image_path, findings, highlight_idx=None, viewport_height=800, device='desktop'):
-    """Create an image with one finding highlighted by dimming everything else"""
-    # Use the annotated image (with all boxes already drawn)
-    img = Image.open(base_image_path).convert("RGBA")
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+def _alpha_lut(gradient_falloff, max_alpha):
+    """uint8 alpha for every squared distance 0..falloff² (sqrt evaluated once per value, not per pixel)"""
+    d2 = np.arange(gradient_falloff * gradient_falloff + 1)
+    return np.minimum(max_alpha, np.sqrt(d2) / gradient_falloff * max_alpha).astype(np.uint8)
+
+def spotlight_alpha(height, width, box, gradient_falloff, max_alpha=180):
+    """Build the dimming alpha mask (0 inside box, max_alpha beyond the falloff band)"""
+    elem_x1, elem_y1, elem_x2, elem_y2 = box
+    alpha = np.full((height, width), max_alpha, dtype=np.uint8)
+    
+    # Only a band of `gradient_falloff` pixels around the box has a varying alpha;
+    # everything inside is 0 and everything further out stays fully dimmed
+    band_x1 = max(0, elem_x1 - gradient_falloff)
+    band_y1 = max(0, elem_y1 - gradient_falloff)
+    band_x2 = min(width, elem_x2 + gradient_falloff + 1)
+    band_y2 = min(height, elem_y2 + gradient_falloff + 1)
+    if band_x2 <= band_x1 or band_y2 <= band_y1:
+        return alpha
+    
+    inner_x1 = min(band_x2, max(band_x1, elem_x1))
+    inner_y1 = min(band_y2, max(band_y1, elem_y1))
+    inner_x2 = max(inner_x1, min(band_x2, elem_x2 + 1))
+    inner_y2 = max(inner_y1, min(band_y2, elem_y2 + 1))
+    
+    lut = _alpha_lut(gradient_falloff, max_alpha)
+    max_d2 = len(lut) - 1
+    
+    def fill(ys, ye, xs, xe):
+        # Distance to box edges as a 1-D column/row pair, broadcast only over this strip
+        if ye <= ys or xe <= xs:
+            return
+        y = np.arange(ys, ye, dtype=np.int32)[:, None]
+        x = np.arange(xs, xe, dtype=np.int32)[None, :]
+        dy = np.maximum(np.maximum(elem_y1 - y, 0), y - elem_y2)
+        dx = np.maximum(np.maximum(elem_x1 - x, 0), x - elem_x2)
+        # Integer squared distance (capped at the falloff) indexes a precomputed alpha table
+        d2 = np.minimum(dx * dx + dy * dy, max_d2)
+        alpha[ys:ye, xs:xe] = lut[d2]
+    
+    fill(band_y1, inner_y1, band_x1, band_x2)  # top strip
+    fill(inner_y2, band_y2, band_x1, band_x2)  # bottom strip
+    fill(inner_y1, inner_y2, band_x1, inner_x1)  # left strip
+    fill(inner_y1, inner_y2, inner_x2, band_x2)  # right strip
+    alpha[inner_y1:inner_y2, inner_x1:inner_x2] = 0
+    return alpha
+
+def dim_rgb(rgb, alpha):
+    """Darken an RGB uint8 array by a per-pixel uint8 alpha (equivalent to compositing black on top)"""
+    inv = np.uint16(256) - alpha  # 256 keeps alpha=0 pixels exactly unchanged
+    return ((rgb.astype(np.uint16) * inv[:, :, None]) >> 8).astype(np.uint8)
+
+def dim_uniform(rgb, keep=0.35):
+    """Darken a whole RGB uint8 array to `keep` of its brightness, returning a new array"""
+    if cv2 is not None:
+        # OpenCV's saturating scale is SIMD and multi-threaded
+        return cv2.convertScaleAbs(rgb, alpha=keep)
+    return ((rgb.astype(np.uint16) * int(keep * 256)) >> 8).astype(np.uint8)
+
+@st.cache_resource(max_entries=8)
+def _load_base_rgb(path, mtime):
+    """Decode an annotated screenshot to a read-only RGB array (mtime keys the cache on file changes)"""
+    arr = np.asarray(Image.open(path).convert("RGB"))
+    arr.setflags(write=False)
+    return arr
+
+def device_target_width(device, width):
+    """Viewport width to emulate for a device (desktop keeps the screenshot width)"""
+    device = (device or 'desktop').lower()
+    if device == 'mobile':
+        return 390
+    elif device == 'ipad':
+        return 768
+    return width
+
+def resize_to_width(img, target_w):
+    """Downscale a PIL image to target_w keeping aspect ratio (never upscales)"""
+    if not target_w or img.width <= target_w:
+        return img
+    scale = target_w / img.width
+    new_h = max(1, int(img.height * scale))
+    # reducing_gap lets Pillow box-reduce by an integer factor first, so the Lanczos
+    # pass only runs on an image at most ~2x the target size
+    return img.resize((target_w, new_h), Image.LANCZOS, reducing_gap=2.0)
+
+def render_highlight(base, bbox=None, viewport_height=800, device='desktop', use_spotlight=False):
+    """Render one element (bbox=(x1, y1, x2, y2)) of an RGB page array highlighted by dimming everything else.
+    use_spotlight=True fades the dimming out around the element; otherwise the rest of the viewport
+    is dimmed uniformly and the element is outlined. Returns (PIL image, crop_y_start, crop_y_end).
+    """
+    img_h, img_w = base.shape[:2]
+    
+    # Resize to emulate device viewport widths (downscale only)
+    target_w = device_target_width(device, img_w)
     
     crop_y_start = 0
-    crop_y_end = img.height
+    crop_y_end = img_h
     
     # If highlighting a specific finding, crop and dim around it
-    if highlight_idx is not None and highlight_idx < len(findings):
-        f = findings[highlight_idx]
-        bbox = f['bbox']
+    if bbox is not None:
+        x1, y1, x2, y2 = bbox
         
         # Calculate element center
-        elem_center_y = (bbox['y1'] + bbox['y2']) // 2
+        elem_center_y = (y1 + y2) // 2
         
         # Crop to viewport centered on element (with some context above/below)
         crop_y_start = max(0, elem_center_y - viewport_height // 2)
-        crop_y_end = min(img.height, crop_y_start + viewport_height)
+        crop_y_end = min(img_h, crop_y_start + viewport_height)
         
         # Adjust if we hit bottom of page
-        if crop_y_end == img.height:
+        if crop_y_end == img_h:
             crop_y_start = max(0, crop_y_end - viewport_height)
         
-        # Crop FIRST to reduce processing
-        img = img.crop((0, crop_y_start, img.width, crop_y_end))
-        
-        # Create overlay ONLY for visible region (much faster!)
-        overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-        overlay_array = np.array(overlay, dtype=np.float32)
+        # Crop FIRST to reduce processing (a view into the cached array, no copy),
+        # then downscale so the overlay is only built at the displayed resolution
+        result = resize_to_width(Image.fromarray(base[crop_y_start:crop_y_end], 'RGB'), target_w)
+        scale = result.width / img_w
         
         padding = 10
-        x1, y1, x2, y2 = bbox['x1'], bbox['y1'], bbox['x2'], bbox['y2']
         
         # Adjust coordinates for cropped image
         y1 -= crop_y_start
         y2 -= crop_y_start
         
-        # Element bounds
-        elem_x1 = x1 - padding
-        elem_y1 = y1 - padding
-        elem_x2 = x2 + padding
-        elem_y2 = y2 + padding
-        
-        # Create distance-based gradient (only for visible region)
-        gradient_falloff = 10  # Pixels for gradient to fully fade (smaller = tighter spotlight)
-        height, width = img.size[1], img.size[0]
-        
-        # Use vectorized numpy operations instead of loops (much faster!)
-        y_coords, x_coords = np.ogrid[0:height, 0:width]
-        
-        # Calculate distance from element box for all pixels at once
-        # Correct distance calculation: ensure we compute distance to box edges
-        # Use nested np.maximum to emulate max(elem_x1 - x, 0, x - elem_x2)
-        dx = np.maximum(np.maximum(elem_x1 - x_coords, 0), x_coords - elem_x2)
-        dy = np.maximum(np.maximum(elem_y1 - y_coords, 0), y_coords - elem_y2)
-        distance = np.sqrt(dx**2 + dy**2)
-        
-        # Map distance to opacity (0-180)
-        alpha = np.minimum(180, (distance / gradient_falloff * 180)).astype(np.uint8)
-        overlay_array[:, :, 3] = alpha
-        
-        overlay = Image.fromarray(overlay_array.astype(np.uint8), 'RGBA')
+        # Element bounds (in resized pixels)
+        elem_x1 = int((x1 - padding) * scale)
+        elem_y1 = int((y1 - padding) * scale)
+        elem_x2 = int((x2 + padding) * scale)
+        elem_y2 = int((y2 + padding) * scale)
         
-        # Composite the overlay onto the cropped image
-        img = Image.alpha_composite(img, overlay)
-        
-        # Update crop bounds (already cropped)
-        crop_y_start = 0
-        crop_y_end = img.height
-    
-    # Convert to RGB
-    result = img.convert("RGB")
-
-    # Resize to emulate device viewport widths (downscale only)
-    device = (device or 'desktop').lower()
-    if device == 'mobile':
-        target_w = 390
-    elif device == 'ipad':
-        target_w = 768
+        # Visible part of the element; if it fills most of the viewport the dimming
+        # would barely show, so just outline it instead of building the overlay
+        visible_w = max(0, min(elem_x2, result.width) - max(elem_x1, 0))
+        visible_h = max(0, min(elem_y2, result.height) - max(elem_y1, 0))
+        if visible_w * visible_h > 0.6 * result.width * result.height:
+            result = result.copy()
+            ImageDraw.Draw(result).rectangle([elem_x1, elem_y1, elem_x2, elem_y2], outline=(255, 215, 0), width=4)
+        elif not use_spotlight:
+            # Uniform dim (one scalar multiply) with the element left untouched and outlined
+            rgb = np.asarray(result)
+            dimmed = dim_uniform(rgb)
+            inner = (slice(max(0, elem_y1), max(0, elem_y2)), slice(max(0, elem_x1), max(0, elem_x2)))
+            dimmed[inner] = rgb[inner]
+            result = Image.fromarray(dimmed, 'RGB')
+            ImageDraw.Draw(result).rectangle([elem_x1, elem_y1, elem_x2, elem_y2], outline=(255, 215, 0), width=3)
+        else:
+            # Create distance-based gradient (only for visible region)
+            gradient_falloff = max(1, round(10 * scale))  # Pixels for gradient to fully fade (smaller = tighter spotlight)
+            alpha = spotlight_alpha(result.height, result.width, (elem_x1, elem_y1, elem_x2, elem_y2), gradient_falloff)
+            
+            # Blend against black: out = rgb * (1 - alpha/255), done in uint16 fixed point
+            result = Image.fromarray(dim_rgb(np.asarray(result), alpha), 'RGB')
     else:
-        target_w = result.width
-
-    # Only downscale if the image is wider than the target
-    if target_w and result.width > target_w:
-        scale = target_w / result.width
-        new_h = max(1, int(result.height * scale))
-        result = result.resize((target_w, new_h), Image.LANCZOS)
+        result = resize_to_width(Image.fromarray(base, 'RGB'), target_w)
 
     return result, crop_y_start, crop_y_end
 
+@st.cache_data(ttl=24*60*60, max_entries=64)
+def create_highlighted_image(base_image_path, base_mtime, bbox=None, viewport_height=800, device='desktop', use_spotlight=False):
+    """Create PNG bytes with one element highlighted (see render_highlight).
+    Arguments are hashable primitives so identical reruns are served from the Streamlit data cache.
+    """
+    # Use the annotated image (with all boxes already drawn), decoded once per file version
+    base = _load_base_rgb(base_image_path, base_mtime)
+    result, crop_y_start, crop_y_end = render_highlight(base, bbox, viewport_height, device, use_spotlight)
+
+    buf = io.BytesIO()
+    result.save(buf, format='PNG', compress_level=1)
+    return buf.getvalue(), crop_y_start, crop_y_end
+
+def full_page_view_path(img_path, device):
+    """Return a path to the full-page screenshot at the device's display width.
+    Desktop uses the original file; iPad/mobile copies are downscaled once and saved next to it
+    (the annotated filename already carries the device and audit id).
+    """
+    with Image.open(img_path) as img:  # Reads the header only
+        width = img.width
+    target_w = device_target_width(device, width)
+    if width <= target_w:
+        return img_path
+    
+    root, ext = os.path.splitext(img_path)
+    view_path = f"{root}_w{target_w}{ext}"
+    if not os.path.exists(view_path):
+        save_kwargs = {'quality': 85} if ext.lower() in ('.jpg', '.jpeg') else {}
+        with Image.open(img_path) as img:
+            resize_to_width(img.convert("RGB"), target_w).save(view_path, **save_kwargs)
+    return view_path
+
+ISSUE_EXPLANATIONS = {
+    "Ghost Controls": "This element looks interactive but isn't coded properly for screen readers. Use semantic HTML (<button>, <a>) instead of <div> or <span>.",
+    "missing accessible name": "Interactive elements need descriptive text or aria-labels so screen readers can announce their purpose to users.",
+    "Small target size": "Touch targets should be at least 24x24px (WCAG 2.5.8) to be easily clickable, especially for users with motor disabilities.",
+    "color alone": "Links should be underlined or have another visual indicator beyond just color, helping colorblind users identify them.",
+    "styled as button": "This link is styled to look like a button. Screen readers will announce 'link' but users expect button behavior, causing confusion.",
+    "Visual element not found": "The computer vision model detected something that appears interactive, but it's not present in the DOM or is hidden from accessibility tools.",
+    "Overlapping": "Interactive elements are visually overlapping, making it difficult for users to accurately click the intended target.",
+    "Insufficient spacing": "Elements are too close together. Recommend at least 8px spacing between interactive elements for easier clicking.",
+    "Unusually large": "This interactive area is very large, which might be unintentional or confusing to users about what exactly is clickable."
+}
+DEFAULT_EXPLANATION = "This element has an accessibility issue that needs attention."
+
+# One case-insensitive pass over the issue text instead of a substring scan per key
+_EXPLANATION_RE = re.compile('|'.join(re.escape(k) for k in ISSUE_EXPLANATIONS), re.IGNORECASE)
+_EXPLANATION_MAP = {k.lower(): v for k, v in ISSUE_EXPLANATIONS.items()}
+
 def get_issue_explanation(issue_text):
     """Return a helpful explanation for different types of accessibility issues"""
-    explanations = {
-        "Ghost Controls": "This element looks interactive but isn't coded properly for screen readers. Use semantic HTML (<button>, <a>) instead of <div> or <span>.",
-        "missing accessible name": "Interactive elements need descriptive text or aria-labels so screen readers can announce their purpose to users.",
-        "Small target size": "Touch targets should be at least 24x24px (WCAG 2.5.8) to be easily clickable, especially for users with motor disabilities.",
-        "color alone": "Links should be underlined or have another visual indicator beyond just color, helping colorblind users identify them.",
-        "styled as button": "This link is styled to look like a button. Screen readers will announce 'link' but users expect button behavior, causing confusion.",
-        "Visual element not found": "The computer vision model detected something that appears interactive, but it's not present in the DOM or is hidden from accessibility tools.",
-        "Overlapping": "Interactive elements are visually overlapping, making it difficult for users to accurately click the intended target.",
-        "Insufficient spacing": "Elements are too close together. Recommend at least 8px spacing between interactive elements for easier clicking.",
-        "Unusually large": "This interactive area is very large, which might be unintentional or confusing to users about what exactly is clickable."
-    }
-    
-    for key, explanation in explanations.items():
-        if key.lower() in issue_text.lower():
-            return explanation
-    return "This element has an accessibility issue that needs attention."
+    m = _EXPLANATION_RE.search(issue_text)
+    return _EXPLANATION_MAP[m.group(0).lower()] if m else DEFAULT_EXPLANATION
 
 
 st.set_page_config(page_title="AccessVision", layout="wide")
@@ -164,16 +274,68 @@ if 'expanded_finding' not in st.session_state:
 if 'show_results' not in st.session_state:
     st.session_state.show_results = False
 if 'audit_history' not in st.session_state:
-    st.session_state.audit_history = []
+    # Keyed by normalized URL, most recent last
+    st.session_state.audit_history = OrderedDict()
 if 'audit_failed' not in st.session_state:
     st.session_state.audit_failed = False
 
+def get_findings_index(findings, device_key):
+    """Return precomputed status buckets and original indices for the current device's findings.
+    Rebuilt only when the audit results object (or URL/device) changes, not on every rerun.
+    """
+    cache_key = (st.session_state.get('url'), device_key, id(st.session_state.get('per_device_results')), id(findings))
+    cached = st.session_state.get('findings_index')
+    if cached is not None and cached['key'] == cache_key:
+        return cached
+
+    by_confidence = lambda x: x.get('confidence', 0)
+    # Map finding identity -> position in `findings` (replaces O(n) findings.index)
+    orig_idx = {id(f): i for i, f in enumerate(findings)}
+    passing = sorted([f for f in findings if f['status'] == 'PASS'], key=by_confidence, reverse=True)
+    cached = {
+        'key': cache_key,
+        'orig_idx': orig_idx,
+        'issues': sorted([f for f in findings if f['status'] != 'PASS'], key=by_confidence, reverse=True),
+        'passing': passing,
+        # Original index -> position in `passing`, to find the page holding a selected element
+        'passing_pos': {orig_idx[id(f)]: pos for pos, f in enumerate(passing)},
+        'status_counts': Counter(f['status'] for f in findings),
+        'type_status_counts': Counter((f['type'], f['status']) for f in findings),
+    }
+    st.session_state.findings_index = cached
+    # New result set - start passed elements from the first page (or the selected element's, see below)
+    st.session_state.pass_page = 0
+    st.session_state.pass_page_selection = None
+    return cached
+
+def ensure_html_snippets(per_device, max_len=400):
+    """Add a length-capped 'html_snippet' to each matched DOM element, once per device result"""
+    if per_device.get('_snippets_built'):
+        return
+    for f in per_device.get('findings', []):
+        dom = f.get('dom')
+        if dom:
+            html = dom.get('html') or ''
+            dom['html_snippet'] = html[:max_len] + '…' if len(html) > max_len else html
+    per_device['_snippets_built'] = True
+
+def path_stat(path):
+    """Return (exists, mtime) for a result image, cached per session to avoid repeated stat() calls.
+    The cache is cleared whenever a new audit writes files.
+    """
+    cache = st.session_state.setdefault('_stat_cache', {})
+    stat = cache.get(path)
+    if stat is None:
+        try:
+            stat = (True, os.path.getmtime(path))
+        except OSError:
+            stat = (False, None)
+        cache[path] = stat
+    return stat
+
 def get_cached_audit(url):
     """Check if URL exists in audit history and return it"""
-    for audit in reversed(st.session_state.audit_history):
-        if audit['url'] == url:
-            return audit
-    return None
+    return st.session_state.audit_history.get(url)
 
 # Sidebar
 with st.sidebar:
@@ -185,10 +347,7 @@ with st.sidebar:
     if st.session_state.audit_history:
         st.markdown("---")
         st.subheader("Recent Audits")
-        for idx, audit in enumerate(reversed(st.session_state.audit_history[-5:])):
-            # Calculate the actual index in the original list
-            actual_idx = len(st.session_state.audit_history) - 1 - idx
-            
+        for idx, (history_key, audit) in enumerate(list(reversed(st.session_state.audit_history.items()))[:5]):
             col_a, col_b = st.columns([6, 1], vertical_alignment="center")
             with col_a:
                 if st.button(f"🔗 {audit['url'][:30]}...", key=f"history_{idx}", width="stretch"):
@@ -200,7 +359,7 @@ with st.sidebar:
             with col_b:
                 if st.button("❌", key=f"delete_{idx}", width="stretch"):
                     # Remove from history
-                    st.session_state.audit_history.pop(actual_idx)
+                    del st.session_state.audit_history[history_key]
                     # No shared file write; history is per session/tab
                     st.rerun()
 
@@ -239,8 +398,8 @@ if not st.session_state.show_results and run_btn and url:
     cached_audit = get_cached_audit(normalized_url)
     if cached_audit:
         # Load from cache
-        st.session_state.findings = cached_audit['findings']
-        st.session_state.img_path = cached_audit['img_path']
+        st.session_state.per_device_results = cached_audit.get('per_device', {})
+        st.session_state.device_view = 'desktop'
         st.session_state.url = cached_audit['url']
         st.session_state.show_results = True
         st.rerun()
@@ -254,18 +413,35 @@ if not st.session_state.show_results and run_btn and url:
         status_placeholder = st.empty()
         
         progress_placeholder.progress(0)
-        status_placeholder.info("🧠 Loading model and navigating to page...")
         
         # Generate unique audit ID based on timestamp to prevent overwriting cached images
         audit_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # Run per-device audit (desktop, iPad, mobile)
+        # Run per-device audit (desktop, iPad, mobile) on a worker thread. Streamlit widgets
+        # can only be touched from the script thread, so the callback just enqueues updates
+        # and this loop drains them while the audit runs.
+        progress_queue = queue.Queue()
         try:
-            results = auditor.audit_url(normalized_url, progress_callback=lambda msg, pct: (
-                progress_placeholder.progress(pct),
-                status_placeholder.info(msg)
-            ), audit_id=audit_id)
+            with status_placeholder.status("🧠 Loading model and navigating to page...", expanded=False) as audit_status:
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    future = executor.submit(
+                        auditor.audit_url,
+                        normalized_url,
+                        progress_callback=lambda msg, pct: progress_queue.put((msg, pct)),
+                        audit_id=audit_id,
+                    )
+                    while not future.done():
+                        try:
+                            msg, pct = progress_queue.get(timeout=0.1)
+                        except queue.Empty:
+                            continue
+                        progress_placeholder.progress(min(max(pct, 0.0), 1.0))
+                        audit_status.update(label=msg)
+                    results = future.result()
+                audit_status.update(label="✅ Audit complete!", state="complete")
             st.session_state.audit_failed = False
+            # New screenshots were written - drop any cached stat() results
+            st.session_state._stat_cache = {}
         except Exception as e:
             # Mark that the audit failed so UI can show an appropriate message
             st.session_state.audit_failed = True
@@ -287,7 +463,8 @@ if not st.session_state.show_results and run_btn and url:
             'timestamp': datetime.now().isoformat(),
             'per_device': results
         }
-        st.session_state.audit_history.append(audit_entry)
+        st.session_state.audit_history[normalized_url] = audit_entry
+        st.session_state.audit_history.move_to_end(normalized_url)
 
         st.rerun()
 
@@ -310,44 +487,48 @@ if st.session_state.show_results and 'per_device_results' in st.session_state:
         device_key = device_map.get(device_label, "desktop")
         # Persist user's device choice to session state for consistent result selection
         st.session_state.device_view = device_key
+        use_spotlight = st.toggle("Soft spotlight highlight", value=False, key="use_spotlight")
 
         # Determine per-device data now that the device selectbox exists
         per_device = st.session_state.per_device_results.get(device_key, None) if 'per_device_results' in st.session_state else None
         if per_device:
+            ensure_html_snippets(per_device)
             findings = per_device.get('findings', [])
             img_path = per_device.get('annotated_path')
+            jpg_path = per_device.get('annotated_jpg_path')
         else:
             findings = []
             img_path = None
+            jpg_path = None
 
         # Display highlighted element or full-page image when available
-        if img_path and os.path.exists(img_path) and st.session_state.selected_finding is not None and findings:
+        img_exists, img_mtime = path_stat(img_path) if img_path else (False, None)
+        if img_exists and st.session_state.selected_finding is not None and st.session_state.selected_finding < len(findings):
             # Use the annotated image (already has all boxes drawn)
+            # Get the element's position
+            selected = findings[st.session_state.selected_finding]
+            sel_bbox = selected['bbox']
+            elem_y = sel_bbox['y1']
+
+            # Rendered on first selection, then served from the Streamlit data cache
             highlighted_img, crop_start, crop_end = create_highlighted_image(
                 img_path,
-                findings,
-                st.session_state.selected_finding,
+                img_mtime,
+                (sel_bbox['x1'], sel_bbox['y1'], sel_bbox['x2'], sel_bbox['y2']),
                 viewport_height=1000,  # Show ~1000px of context around element
                 device=device_key,
+                use_spotlight=use_spotlight,
             )
 
-            # Get the element's position
-            selected = findings[st.session_state.selected_finding]
-            elem_y = selected['bbox']['y1']
-
             st.caption(f"🎯 Showing element at Y={elem_y}px (viewport: {crop_start}-{crop_end}px)")
             st.image(highlighted_img, caption="Viewport: Element Highlighted", use_container_width=True)
 
-        elif img_path and os.path.exists(img_path):
-            # Show full page when nothing selected (resized to device)
-            full_img, _, _ = create_highlighted_image(
-                img_path,
-                findings,
-                highlight_idx=None,
-                viewport_height=1000,
-                device=device_key,
-            )
-            st.image(full_img, caption="Full Page Analysis", use_container_width=True)
+        elif img_exists:
+            # Show full page when nothing selected (resized to device); served straight
+            # from disk so Streamlit streams the file instead of re-encoding it
+            # (prefers the JPEG copy; the PNG is only needed for highlight compositing)
+            view_source = jpg_path if jpg_path and path_stat(jpg_path)[0] else img_path
+            st.image(full_page_view_path(view_source, device_key), caption="Full Page Analysis", use_container_width=True)
 
             # Show page dimensions info
             try:
@@ -368,9 +549,9 @@ if st.session_state.show_results and 'per_device_results' in st.session_state:
                 if 'url' in st.session_state:
                     st.caption(f"🌐 Auditing: `{st.session_state.url}`")
                 
-                fails = len([f for f in findings if f['status'] == 'FAIL'])
-                warns = len([f for f in findings if f['status'] == 'WARNING'])
-                passes = len([f for f in findings if f['status'] == 'PASS'])
+                findings_index = get_findings_index(findings, device_key)
+                status_counts = findings_index['status_counts']
+                fails, warns, passes = status_counts['FAIL'], status_counts['WARNING'], status_counts['PASS']
                 
                 c1, c2, c3 = st.columns(3)
                 c1.metric("Critical", fails, delta=None, delta_color="inverse")
@@ -391,14 +572,11 @@ if st.session_state.show_results and 'per_device_results' in st.session_state:
                 # Element type breakdown
                 st.markdown("---")
                 with st.expander("📊 Breakdown by Element Type", expanded=False):
-                    element_stats = {}
-                    for f in findings:
-                        elem_type = f['type']
-                        if elem_type not in element_stats:
-                            element_stats[elem_type] = {'FAIL': 0, 'WARNING': 0, 'PASS': 0}
-                        element_stats[elem_type][f['status']] += 1
+                    type_status_counts = findings_index['type_status_counts']
+                    element_types = sorted({elem_type for elem_type, _ in type_status_counts})
                     
-                    for elem_type, stats in sorted(element_stats.items()):
+                    for elem_type in element_types:
+                        stats = {status: type_status_counts[(elem_type, status)] for status in ('FAIL', 'WARNING', 'PASS')}
                         total_elem = stats['FAIL'] + stats['WARNING'] + stats['PASS']
                         st.markdown(f"**{elem_type}** ({total_elem} total)")
                         
@@ -428,14 +606,9 @@ if st.session_state.show_results and 'per_device_results' in st.session_state:
                             </script>
                         """, unsafe_allow_html=True)
                     
-                    # Show failures and warnings first
-                    issues_all = [f for f in findings if f['status'] != 'PASS']
-                    passing_all = [f for f in findings if f['status'] == 'PASS']
-
-                    # Always sort by confidence, no filtering or threshold
-                    issues_all.sort(key=lambda x: x.get('confidence', 0), reverse=True)
-                    passing_all.sort(key=lambda x: x.get('confidence', 0), reverse=True)
-                    issues = issues_all
+                    # Show failures and warnings first (buckets are pre-sorted by confidence)
+                    orig_idx_by_id = findings_index['orig_idx']
+                    issues = findings_index['issues']
 
                     if issues:
                         st.markdown("### ⚠️ Issues Found")
@@ -444,7 +617,7 @@ if st.session_state.show_results and 'per_device_results' in st.session_state:
                             bbox = f['bbox']
                             
                             # Find original index for highlighting
-                            orig_idx = findings.index(f)
+                            orig_idx = orig_idx_by_id[id(f)]
                             
                             # Create anchor for this element
                             is_selected = st.session_state.selected_finding == orig_idx
@@ -486,26 +659,36 @@ if st.session_state.show_results and 'per_device_results' in st.session_state:
                                 
                                 st.caption("**HTML Element:**")
                                 if f['dom']:
-                                    st.code(f['dom']['html'], language='html')
+                                    st.code(f['dom']['html_snippet'], language='html')
                                 else:
                                     st.warning("⚠️ No DOM element matched (visual-only detection)")
                                     st.warning("⚠️ No DOM element matched (visual-only detection)")
                             
                             st.markdown("---")                    # Show passing elements in collapsible section
-                    # Use the earlier computed `passing_all` so sorting applies
-                    try:
-                        passing = passing_all
-                    except NameError:
-                        passing = [f for f in findings if f['status'] == 'PASS']
+                    passing = findings_index['passing']
                     if passing:
                         # Initialize passing section state if not exists
                         if 'passing_section_expanded' not in st.session_state:
                             st.session_state.passing_section_expanded = False
                         
                         with st.expander(f"✅ Passed Elements ({len(passing)})", expanded=st.session_state.passing_section_expanded):
-                            for idx, f in enumerate(passing):
+                            # Render one page at a time - Streamlit ships every widget to the
+                            # browser even while the expander is collapsed
+                            page_size = 20
+                            num_pages = (len(passing) + page_size - 1) // page_size
+                            
+                            # When the selection changes to a passed element, show the page holding it so
+                            # its scroll anchor is rendered
+                            selected_idx = st.session_state.selected_finding
+                            if selected_idx != st.session_state.get('pass_page_selection'):
+                                st.session_state.pass_page_selection = selected_idx
+                                if selected_idx in findings_index['passing_pos']:
+                                    st.session_state.pass_page = findings_index['passing_pos'][selected_idx] // page_size
+                            page = min(st.session_state.get('pass_page', 0), num_pages - 1)
+                            
+                            for idx, f in enumerate(passing[page * page_size:(page + 1) * page_size]):
                                 bbox = f['bbox']
-                                orig_idx = findings.index(f)
+                                orig_idx = orig_idx_by_id[id(f)]
                                 
                                 # Create anchor for this element
                                 is_selected = st.session_state.selected_finding == orig_idx
@@ -543,11 +726,26 @@ if st.session_state.show_results and 'per_device_results' in st.session_state:
                                     
                                     st.caption("**HTML Element:**")
                                     if f['dom']:
-                                        st.code(f['dom']['html'], language='html')
+                                        st.code(f['dom']['html_snippet'], language='html')
                                     else:
                                         st.warning("⚠️ No DOM element matched (visual-only detection)")
                                 
                                 st.markdown("---")
+                            
+                            if num_pages > 1:
+                                col_prev, col_page, col_next = st.columns([1, 2, 1], vertical_alignment="center")
+                                with col_prev:
+                                    if st.button("◀ Prev", key="pass_prev", disabled=page == 0, width="stretch"):
+                                        st.session_state.pass_page = page - 1
+                                        st.session_state.passing_section_expanded = True
+                                        st.rerun()
+                                with col_page:
+                                    st.caption(f"Page {page + 1} of {num_pages}")
+                                with col_next:
+                                    if st.button("Next ▶", key="pass_next", disabled=page >= num_pages - 1, width="stretch"):
+                                        st.session_state.pass_page = page + 1
+                                        st.session_state.passing_section_expanded = True
+                                        st.rerun()
                 else:
                     st.success("✅ No accessibility violations detected!")
 else:
@@ -1,61 +1,723 @@
 import os
-import time
 import io
 import base64
+import random
+import queue
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+try:
+    import numba
+except ImportError:
+    numba = None
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 from ultralytics import YOLO
 from PIL import Image, ImageDraw, ImageFont
 
-class AccessAuditor:
-    def __init__(self, model_path="best.pt"):
-        print(f"🧠 Loading model: {model_path}...")
+def segment_bounds(page_height, segment_height, overlap):
+    """(y_start, y_end) of viewport-sized scan segments that overlap by `overlap` px.
+    Segments advance by segment_height - overlap and stop at the first one reaching the page bottom
+    (no tiny trailing segment).
+    """
+    stride = segment_height - overlap
+    # Ceiling division: strides needed before a segment reaches the bottom
+    n_segments = max(0, -(-(page_height - segment_height) // stride)) + 1 if page_height > 0 else 0
+    return [(i * stride, min(i * stride + segment_height, page_height)) for i in range(n_segments)]
+
+def _pairwise_intersection(boxes_a, boxes_b):
+    """Intersection width and height for every (a, b) pair (negative when the boxes don't overlap)"""
+    inter_w = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2]) - np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    inter_h = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3]) - np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    return inter_w, inter_h
+
+def _vertically_overlapping_pairs(boxes):
+    """Index pairs (i, j) of boxes whose vertical extents overlap, found by sweeping the boxes in y1 order
+    (a coarse spatial index) instead of testing every pair. Full-page screenshots are many viewports tall
+    but one wide, so y separates elements far better than x: an x1 sweep would keep whole columns active."""
+    order = np.argsort(boxes[:, 1], kind='stable')
+    y1_sorted = boxes[order, 1]
+    # Every box after position p in y1 order starts below it, so it overlaps until its top passes p's bottom
+    starts = np.arange(1, len(order) + 1)
+    ends = np.searchsorted(y1_sorted, boxes[order, 3], side='left')
+    counts = np.maximum(ends - starts, 0)
+    first = np.repeat(np.arange(len(order)), counts)
+    second = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    return order[first], order[second]
+
+def deduplicate_detections(det_boxes, det_labels, det_conf):
+    """Remove duplicate detections (overlapping segments, bbox variance), keeping the tighter box.
+    Takes detection columns ((N, 4) boxes, labels, confidences); returns the indices of the kept
+    detections sorted by area, smallest first.
+    """
+    # Sort by area (smallest first) - tighter boxes are more accurate than loose ones
+    det_areas = (det_boxes[:, 2] - det_boxes[:, 0]) * (det_boxes[:, 3] - det_boxes[:, 1])
+    order = np.argsort(det_areas, kind='stable')
+    
+    boxes = det_boxes[order].astype(np.float64)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    labels = np.asarray(det_labels)[order]
+    
+    # Only pairs that can intersect are scored; orient each as (later, earlier) in area order
+    a, b = _vertically_overlapping_pairs(boxes)
+    later, earlier = np.maximum(a, b), np.minimum(a, b)
+    inter_w = np.minimum(boxes[later, 2], boxes[earlier, 2]) - np.maximum(boxes[later, 0], boxes[earlier, 0])
+    inter_h = np.minimum(boxes[later, 3], boxes[earlier, 3]) - np.maximum(boxes[later, 1], boxes[earlier, 1])
+    intersects = (inter_w > 0) & (inter_h > 0)
+    later, earlier = later[intersects], earlier[intersects]
+    inter_area = inter_w[intersects] * inter_h[intersects]
+    
+    # Area ratios are tested by cross-multiplying (boxes are whole pixels, so this is exact) - no divisions
+    # TWO-WAY overlap check: both boxes must overlap >80% with each other
+    # This prevents child elements (button in input) from being deduplicated
+    two_way = (inter_area * 5 > areas[later] * 4) & (inter_area * 5 > areas[earlier] * 4)
+    
+    # SAME CLASS special case: smaller box >80% inside larger AND either
+    # centers very close (<10px) or similar size (<2x ratio)
+    smaller_area = np.minimum(areas[later], areas[earlier])
+    larger_area = np.maximum(areas[later], areas[earlier])
+    centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+    center_dist = np.hypot(centers[later, 0] - centers[earlier, 0], centers[later, 1] - centers[earlier, 1])
+    same_class = ((labels[later] == labels[earlier]) & (inter_area * 5 > smaller_area * 4)
+                  & ((center_dist < 10) | (larger_area < smaller_area * 2)))
+    
+    # Duplicate pairs grouped by candidate, each group ordered by the earlier (smaller) box
+    dup = np.flatnonzero(two_way | same_class)
+    dup = dup[np.lexsort((earlier[dup], later[dup]))]
+    group_bounds = np.searchsorted(later[dup], np.arange(len(order) + 1))
+    
+    # Greedy pass in area order: a detection survives unless it duplicates an already-kept one
+    kept = np.zeros(len(order), dtype=bool)
+    for i, (x1, y1, x2, y2) in enumerate(det_boxes[order].tolist()):
+        for p in dup[group_bounds[i]:group_bounds[i + 1]]:
+            if kept[earlier[p]]:
+                break
+        else:
+            kept[i] = True
+            continue
+        conf = det_conf[order[i]]
+        if two_way[p]:
+            print(f"  🔄 Skipping duplicate {labels[i]} at ({x1},{y1})-({x2},{y2}) [conf={conf:.2f}] - overlaps {inter_area[p]/areas[later[p]]*100:.0f}%/{inter_area[p]/areas[earlier[p]]*100:.0f}% with {labels[earlier[p]]}")
+        else:
+            print(f"  🔄 Skipping duplicate {labels[i]} at ({x1},{y1})-({x2},{y2}) [conf={conf:.2f}] - same class, {inter_area[p]/smaller_area[p]*100:.0f}% overlap, {center_dist[p]:.0f}px apart, {larger_area[p]/smaller_area[p]:.1f}x size")
+    return order[kept]
+
+if numba is not None:
+    # Serial on purpose: device threads call this concurrently, and Numba's fallback parallel threading
+    # layer (workqueue) aborts the process on concurrent kernel launches. N is a few hundred boxes anyway.
+    @numba.njit(cache=True)
+    def _match_boxes(yolo_boxes, dom_boxes):
+        """Fused IoU arg-max and closest-center search, one sweep over dom_boxes per detection"""
+        n = yolo_boxes.shape[0]
+        best_idx = np.full(n, -1)
+        best_iou = np.zeros(n)
+        closest_idx = np.full(n, -1)
+        closest_dist = np.full(n, np.inf)
+        for i in range(n):
+            ax1, ay1, ax2, ay2 = yolo_boxes[i, 0], yolo_boxes[i, 1], yolo_boxes[i, 2], yolo_boxes[i, 3]
+            area_a = (ax2 - ax1) * (ay2 - ay1)
+            acx, acy = (ax1 + ax2) / 2, (ay1 + ay2) / 2
+            for j in range(dom_boxes.shape[0]):
+                bx1, by1, bx2, by2 = dom_boxes[j, 0], dom_boxes[j, 1], dom_boxes[j, 2], dom_boxes[j, 3]
+                inter_w = min(ax2, bx2) - max(ax1, bx1)
+                inter_h = min(ay2, by2) - max(ay1, by1)
+                if inter_w >= 0 and inter_h >= 0:
+                    inter_area = inter_w * inter_h
+                    union_area = area_a + (bx2 - bx1) * (by2 - by1) - inter_area
+                    if union_area > 0 and inter_area / union_area > best_iou[i]:
+                        best_iou[i] = inter_area / union_area
+                        best_idx[i] = j
+                dist = np.hypot(acx - (bx1 + bx2) / 2, acy - (by1 + by2) / 2)
+                if dist < closest_dist[i]:
+                    closest_dist[i] = dist
+                    closest_idx[i] = j
+        return best_idx, best_iou, closest_idx, closest_dist
+else:
+    _match_boxes = None
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _layout_pairs(boxes, inflated, order, interactive, max_gap):
+        """layout_conflicts pair checks as one native y-sweep (inflated = boxes grown by max_gap / 2 in y, order =
+        their y1 order); sequential because every pair updates both of its elements"""
+        n = boxes.shape[0]
+        overlaps_other = np.zeros(n, dtype=np.bool_)
+        nearest_sq = np.full(n, np.inf)
+        for p in range(n):
+            i = order[p]
+            area_i = (boxes[i, 2] - boxes[i, 0]) * (boxes[i, 3] - boxes[i, 1])
+            for q in range(p + 1, n):
+                j = order[q]
+                # Every later box starts lower still, so none of them are within max_gap vertically either
+                if inflated[j, 1] >= inflated[i, 3]:
+                    break
+                if boxes[i, 0] >= boxes[j, 2] + max_gap or boxes[j, 0] >= boxes[i, 2] + max_gap:
+                    continue
+                inter_w = min(boxes[i, 2], boxes[j, 2]) - max(boxes[i, 0], boxes[j, 0])
+                inter_h = min(boxes[i, 3], boxes[j, 3]) - max(boxes[i, 1], boxes[j, 1])
+                overlap_area = max(inter_w, 0.0) * max(inter_h, 0.0)
+                area_j = (boxes[j, 2] - boxes[j, 0]) * (boxes[j, 3] - boxes[j, 1])
+                nested = ((area_i > 0 and overlap_area * 20 >= area_i * 19)
+                          or (area_j > 0 and overlap_area * 20 >= area_j * 19))
+                smaller_area = min(area_i, area_j)
+                if not nested and smaller_area > 0 and overlap_area * 10 > smaller_area * 3:
+                    overlaps_other[i] = True
+                    overlaps_other[j] = True
+                if interactive[i] or interactive[j]:
+                    gap_x, gap_y = max(-inter_w, 0.0), max(-inter_h, 0.0)
+                    edge_sq = gap_x * gap_x + gap_y * gap_y
+                    if edge_sq < max_gap * max_gap:
+                        if interactive[i]:
+                            nearest_sq[i] = min(nearest_sq[i], edge_sq)
+                        if interactive[j]:
+                            nearest_sq[j] = min(nearest_sq[j], edge_sq)
+        return overlaps_other, np.sqrt(nearest_sq)
+else:
+    _layout_pairs = None
+
+def layout_conflicts(boxes, max_gap=8, interactive=None):
+    """Pairwise layout checks between detected elements.
+    Returns (overlaps_other, nearest_edge_distance): whether each box overlaps another by >30% of the smaller one
+    (ignoring parent-child pairs where either is 95%+ inside the other), and the edge-to-edge distance to its
+    nearest other box when that is closer than max_gap (inf otherwise). The distance is only measured for boxes
+    in the interactive mask (default all), others get inf.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    n = len(boxes)
+    interactive = np.ones(n, dtype=bool) if interactive is None else np.asarray(interactive, dtype=bool)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    
+    # Only pairs less than max_gap apart vertically can overlap or be too close: find them with the same
+    # y-sweep as dedup, on boxes grown by half the gap at top and bottom
+    half_gap = np.array([0, max_gap / 2, 0, max_gap / 2])
+    inflated = boxes + half_gap * [0, -1, 0, 1]
+    
+    # numba is a declared dependency, so the compiled sweep is the normal path; the NumPy version below
+    # gives identical results and only runs where numba can't be installed
+    if _layout_pairs is not None:
+        return _layout_pairs(boxes, inflated, np.argsort(inflated[:, 1], kind='stable'), interactive, float(max_gap))
+    
+    a, b = _vertically_overlapping_pairs(inflated)
+    # Cheap early reject before the overlap math: pairs max_gap or more apart horizontally can neither
+    # overlap nor be too close
+    near = (boxes[a, 0] < boxes[b, 2] + max_gap) & (boxes[b, 0] < boxes[a, 2] + max_gap)
+    a, b = a[near], b[near]
+    inter_w = np.minimum(boxes[a, 2], boxes[b, 2]) - np.maximum(boxes[a, 0], boxes[b, 0])
+    inter_h = np.minimum(boxes[a, 3], boxes[b, 3]) - np.maximum(boxes[a, 1], boxes[b, 1])
+    overlap_area = np.maximum(inter_w, 0) * np.maximum(inter_h, 0)
+    
+    # Area ratios are tested by cross-multiplying (exact for whole-pixel boxes) - no divisions
+    # Skip parent-child relationships (one element 95%+ inside another)
+    # This is intentional design (e.g., buttons inside search bar)
+    nested = (((areas[a] > 0) & (overlap_area * 20 >= areas[a] * 19))
+              | ((areas[b] > 0) & (overlap_area * 20 >= areas[b] * 19)))
+    
+    # Significant overlap (>30% of smaller element) but NOT parent-child
+    smaller_area = np.minimum(areas[a], areas[b])
+    significant = (smaller_area > 0) & (overlap_area * 10 > smaller_area * 3)
+    conflict = significant & ~nested
+    ends = np.concatenate((a, b))
+    overlaps_other = np.bincount(ends[np.tile(conflict, 2)], minlength=n) > 0
+    
+    # Spacing only matters for interactive elements: pairs with neither end interactive are dropped before
+    # the gap math. Edge-to-edge gaps are the negated (non-overlapping) intersection extents; compare squared
+    # distances and take a single sqrt per element at the end
+    spaced = np.flatnonzero(interactive[a] | interactive[b])
+    gap_x, gap_y = np.maximum(-inter_w[spaced], 0), np.maximum(-inter_h[spaced], 0)
+    edge_sq = np.tile(gap_x * gap_x + gap_y * gap_y, 2)
+    
+    # Fold each close pair onto both of its elements (the interactive ones) in one scatter
+    spaced_ends = np.concatenate((a[spaced], b[spaced]))
+    close = (edge_sq < max_gap * max_gap) & interactive[spaced_ends]
+    nearest_sq = np.full(n, np.inf)
+    np.minimum.at(nearest_sq, spaced_ends[close], edge_sq[close])
+    return overlaps_other, np.sqrt(nearest_sq)
+
+def select_dom_matches(best_idx, best_iou, closest_idx, closest_dist):
+    """Pick each detection's DOM element from match_dom_elements output.
+    Returns (dom_idx, by_iou): the matched DOM index (-1 when none) and whether it came from the IoU match.
+    """
+    # Lower threshold to 0.1 (10% overlap) to catch more matches
+    # YOLO boxes are often imprecise, especially for text links
+    by_iou = (best_idx >= 0) & (best_iou > 0.1)
+    # Fallback: center-point distance matching - sometimes the YOLO box is off but its center is within 50px
+    by_center = ~by_iou & (closest_idx >= 0) & (closest_dist < 50)
+    return np.where(by_iou, best_idx, np.where(by_center, closest_idx, -1)), by_iou
+
+# Annotation color per finding status
+STATUS_COLORS = {"PASS": "green", "WARNING": "orange", "FAIL": "red"}
+
+# (status, issue) for each WCAG rule, in priority order: an element gets the first rule it trips.
+# Issues are formatted with w/h (visual size), dom_w/dom_h (DOM size) and distance (nearest neighbour gap).
+WCAG_RULES = [
+    ("WARNING", "Visual element not found in DOM - possible Ghost Control (WCAG 4.1.2)"),
+    ("PASS", "Decorative element (visual-only, not interactive)"),
+    ("FAIL", "Visual Button coded as <div>/<span> (WCAG 4.1.2)"),
+    ("FAIL", "Interactive element missing accessible name (WCAG 1.1.1)"),
+    ("FAIL", "Image missing alt text (WCAG 1.1.1)"),
+    ("WARNING", "Visual size ({w}x{h}px) much smaller than clickable area ({dom_w}x{dom_h}px) - unclear target (WCAG 2.5.8)"),
+    ("WARNING", "Visual target appears small ({w}x{h}px) - may be hard to click (WCAG 2.5.8)"),
+    ("WARNING", "Link relies on color alone (No Underline) (WCAG 1.4.1)"),
+    ("WARNING", "Link styled as button - screen readers announce 'link' but appears as button (WCAG 1.3.1)"),
+    ("WARNING", "Overlapping interactive elements - may be hard to click (WCAG 2.5.8)"),
+    ("WARNING", "Insufficient spacing ({distance:.0f}px) to nearby element - recommend 8px+ (WCAG 2.5.8)"),
+    ("WARNING", "Unusually large interactive element ({w}x{h}px) - may be unintentional"),
+]
+
+# Tag/label sets used by the WCAG checks
+GHOST_TAGS = frozenset({"DIV", "SPAN", "IMG"})  # non-semantic tags a visual button may be coded as
+CLICKABLE_LABELS = frozenset({"Button", "Link"})
+TARGET_LABELS = frozenset({"Button", "Link", "Input"})  # subject to target-size checks
+
+def label_in(labels, allowed):
+    """Boolean mask of labels that are in the allowed set"""
+    return np.fromiter((label in allowed for label in labels), dtype=bool, count=len(labels))
+
+def classify_elements(labels, widths, heights, dom_idx, dom_elements, overlaps_other, nearest_edge_distance):
+    """Run the WCAG checks for every element at once.
+    Returns (rule, actual_labels): the WCAG_RULES index per element (-1 = PASS, no issue) and the
+    model labels corrected by the matched DOM tag.
+    """
+    labels = np.asarray(labels, dtype=object)
+    w, h = np.asarray(widths), np.asarray(heights)
+    has_dom = dom_idx >= 0
+    
+    # DOM attributes per element, each row read once; -1 (no match) indexes the empty sentinel appended at the end
+    def attributes(e):
+        get = e.get
+        tag = get('tagName', '')
+        aria = (get('ariaLabel') or '').strip()
+        return (tag, get('role'), tag in GHOST_TAGS, bool((get('innerText') or '').strip() or aria),
+                bool((get('alt') or '').strip() or aria), 'underline' in (get('textDecoration') or ''),
+                get('width', np.nan), get('height', np.nan))
+    columns = list(zip(*map(attributes, list(dom_elements) + [{}])))
+    tag, role = (np.array(col, dtype=object)[dom_idx] for col in columns[:2])
+    ghost_tag, has_name, has_alt, underlined = (np.array(col, dtype=bool)[dom_idx] for col in columns[2:6])
+    dom_w, dom_h = (np.array(col, dtype=float)[dom_idx] for col in columns[6:])
+    dom_w, dom_h = np.where(np.isnan(dom_w), w, dom_w), np.where(np.isnan(dom_h), h, dom_h)
+    
+    # VISUAL-FIRST APPROACH: The CV model found an interactive element visually.
+    # Now we verify its DOM implementation. This catches "Ghost Controls" - 
+    # things that LOOK interactive but aren't coded properly.
+    # DOM correction is secondary; the visual detection is the innovation.
+    actual = labels.copy()
+    actual[has_dom & (tag == "BUTTON") & (labels == "Link")] = "Button"
+    actual[has_dom & (tag == "A") & (labels == "Button")] = "Link"
+    is_button, is_link = actual == "Button", actual == "Link"
+    interactive = label_in(actual, CLICKABLE_LABELS)
+    target = label_in(actual, TARGET_LABELS)
+    visual_area = w * h
+    
+    rule = np.select([
+        # No DOM match - looks interactive but isn't in DOM = potential Ghost Control
+        ~has_dom & label_in(labels, CLICKABLE_LABELS),
+        # Image or other non-interactive element = likely decorative
+        ~has_dom,
+        # --- WCAG CHECKS (Visual + Semantic) ---
+        # 1. Ghost Controls - VISUAL DETECTION IS KEY HERE
+        # Code scanners miss this because they only see valid HTML.
+        # We detect the VISUAL button, then verify semantic correctness.
+        is_button & ghost_tag & (role != "button"),
+        # 2. Empty Interactive Elements - check accessible name sources (text content, aria-label)
+        interactive & ~has_name,
+        # 2b. Images without alt text
+        (tag == "IMG") & ~has_alt,
+        # 3. Target Size - PURELY VISUAL CHECK
+        # This is impossible for code scanners - they don't know rendered size.
+        # DOM significantly larger than visual (>20% larger) on a small target...
+        target & (dom_w * dom_h > visual_area * 1.2) & (visual_area < 1000),
+        # ...or the visual target itself is small
+        target & ((w < 24) | (h < 24)),
+        # 4. Links Color Only - VISUAL VERIFICATION
+        is_link & ~underlined,
+        # 5. Semantic Mismatch - Link styled as Button
+        # This catches the anti-pattern where <a> tags are styled to look like buttons.
+        # Screen readers say "link" but visual users see a "button" - confusing!
+        is_link & (labels == "Button"),
+        # 6. Overlapping Elements - VISUAL PROXIMITY CHECK (code scanners can't detect visual collisions)
+        overlaps_other,
+        # 7. Insufficient Spacing - elements very close together (< 8px apart) make clicking difficult
+        interactive & (nearest_edge_distance < 8),
+        # 8. Very Large Interactive Elements - unusually large clickable areas can confuse users
+        interactive & ((w > 400) | (h > 200)),
+    ], np.arange(len(WCAG_RULES)), default=-1)
+    return rule, actual
+
+def dom_box_array(dom_elements):
+    """(x1, y1, x2, y2) of DOM element dicts (x, y, width, height) as an (M, 4) float array"""
+    boxes = np.fromiter((v for e in dom_elements for v in (e['x'], e['y'], e['width'], e['height'])),
+                        dtype=np.float64, count=4 * len(dom_elements)).reshape(-1, 4)
+    boxes[:, 2:] += boxes[:, :2]
+    return boxes
+
+def match_dom_elements(yolo_boxes, dom_boxes):
+    """Match every YOLO detection box against every DOM box (see dom_box_array) at once.
+    Returns arrays (best_iou_idx, best_iou, closest_idx, closest_dist); indices are -1 when there is no candidate.
+    """
+    n = len(yolo_boxes)
+    if n == 0 or len(dom_boxes) == 0:
+        return np.full(n, -1), np.zeros(n), np.full(n, -1), np.full(n, np.inf)
+    
+    yolo_boxes = np.asarray(yolo_boxes, dtype=np.float64)
+    
+    if _match_boxes is not None:
+        return _match_boxes(yolo_boxes, dom_boxes)
+    
+    # IoU (Intersection over Union) matrix, shape (n_detections, n_dom)
+    inter_w, inter_h = _pairwise_intersection(yolo_boxes, dom_boxes)
+    inter_area = np.where((inter_w >= 0) & (inter_h >= 0), inter_w * inter_h, 0.0)
+    yolo_area = (yolo_boxes[:, 2] - yolo_boxes[:, 0]) * (yolo_boxes[:, 3] - yolo_boxes[:, 1])
+    dom_area = (dom_boxes[:, 2] - dom_boxes[:, 0]) * (dom_boxes[:, 3] - dom_boxes[:, 1])
+    union_area = yolo_area[:, None] + dom_area[None, :] - inter_area
+    with np.errstate(divide='ignore', invalid='ignore'):
+        iou = np.where(union_area > 0, inter_area / union_area, 0.0)
+    best_idx = iou.argmax(axis=1)
+    best_iou = iou[np.arange(n), best_idx]
+    best_idx = np.where(best_iou > 0, best_idx, -1)
+    
+    # Center-point distances for the fallback match
+    yolo_centers = (yolo_boxes[:, :2] + yolo_boxes[:, 2:]) / 2
+    dom_centers = (dom_boxes[:, :2] + dom_boxes[:, 2:]) / 2
+    dist = np.hypot(yolo_centers[:, None, 0] - dom_centers[None, :, 0], yolo_centers[:, None, 1] - dom_centers[None, :, 1])
+    closest_idx = dist.argmin(axis=1)
+    closest_dist = dist[np.arange(n), closest_idx]
+    return best_idx, best_iou, closest_idx, closest_dist
+
+# Device viewport emulation: (width, height, devicePixelRatio, user agent); None keeps Chrome's own UA
+DEVICE_PROFILES = {
+    'desktop': (1280, 800, 1, None),
+    # iPad Pro
+    'ipad': (768, 1024, 2, "Mozilla/5.0 (iPad; CPU OS 15_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.0 Mobile/15E148 Safari/604.1"),
+    # iPhone 13 Pro
+    'mobile': (390, 844, 3, "Mozilla/5.0 (iPhone; CPU iPhone OS 15_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.0 Mobile/15E148 Safari/604.1"),
+}
+
+def _start_chrome(binary_location, driver_path):
+    """Launch headless Chrome with the given binary (None = default Chrome) and chromedriver"""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--window-size=1280,800")
+    if binary_location:
+        chrome_options.binary_location = binary_location
+    return webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+
+# (chrome binary or None, chromedriver path) that launched Chrome, set by the first successful launch
+_chrome_paths = None
+_chrome_paths_lock = threading.Lock()
+
+def launch_chrome():
+    """Start a headless Chrome driver. Paths are resolved by actually launching, once per process;
+    later drivers reuse whichever paths worked"""
+    global _chrome_paths
+    with _chrome_paths_lock:
+        if _chrome_paths is None:
+            # Try to use system chromium-driver first (for Streamlit Cloud), fall back to ChromeDriverManager
+            try:
+                driver = _start_chrome("/usr/bin/chromium", "/usr/bin/chromedriver")
+                _chrome_paths = ("/usr/bin/chromium", "/usr/bin/chromedriver")
+            except Exception:
+                # Local development: use ChromeDriverManager
+                paths = (None, ChromeDriverManager().install())
+                driver = _start_chrome(*paths)
+                _chrome_paths = paths
+            return driver
+    return _start_chrome(*_chrome_paths)
+
+# Page dimensions AND every visible interactive DOM element, evaluated in one CDP round trip once images
+# settle. Element boxes are absolute page positions in screenshot (device) pixels; images are included
+# for visual-only detections.
+_DOM_QUERY_SCRIPT = """
+    (async () => {
+        // Let images that were switched to eager finish (max 3s), then wait two frames so layout is painted
+        const pending = Array.from(document.images).filter((img) => !img.complete);
+        await Promise.race([
+            Promise.all(pending.map((img) => new Promise((done) => { img.addEventListener('load', done, { once: true }); img.addEventListener('error', done, { once: true }); }))),
+            new Promise((done) => setTimeout(done, 3000))
+        ]);
+        await new Promise((done) => requestAnimationFrame(() => requestAnimationFrame(done)));
+        
+        const elementList = [];
+        let domError = null;
+        try {
+            const elements = document.querySelectorAll(
+                'button, a, input, textarea, select, img, [role="button"], [role="link"], [onclick], [tabindex]:not([tabindex="-1"])'
+            );
+            
+            const dpr = window.devicePixelRatio || 1;
+            // Absolute position = viewport rect + scroll offset
+            const scrollY = window.pageYOffset || document.documentElement.scrollTop;
+            const scrollX = window.pageXOffset || document.documentElement.scrollLeft;
+            for (let el of elements) {
+                // Skip invisible elements
+                const style = window.getComputedStyle(el);
+                if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') {
+                    continue;
+                }
+            
+                const rect = el.getBoundingClientRect();
+            
+                // Skip elements with no size
+                if (rect.width === 0 || rect.height === 0) continue;
+            
+                // Multiply CSS pixels by devicePixelRatio so coordinates align with screenshot pixels
+                elementList.push({
+                    tagName: el.tagName,
+                    role: el.getAttribute('role'),
+                    ariaLabel: el.getAttribute('aria-label'),
+                    title: el.getAttribute('title'),
+                    alt: el.getAttribute('alt'),
+                    innerText: (el.innerText || "").substring(0, 100),
+                    html: el.outerHTML.substring(0, 500),
+                    textDecoration: style.textDecorationLine,
+                    x: Math.round((rect.left + scrollX) * dpr),
+                    y: Math.round((rect.top + scrollY) * dpr),
+                    width: Math.round(rect.width * dpr),
+                    height: Math.round(rect.height * dpr)
+                });
+            }
+        } catch (error) {
+            domError = String(error);
+        }
+        return {
+            dims: [document.body.scrollHeight, window.innerHeight, window.innerWidth],
+            windowSize: [window.outerWidth, window.outerHeight],
+            scroll: [window.pageYOffset, window.pageXOffset],
+            elements: elementList,
+            domError: domError
+        };
+    })()
+"""
+
+# Size of the '#N' element labels on the annotated image
+LABEL_FONT_SIZE = 16
+
+@functools.lru_cache(maxsize=None)
+def load_font(size):
+    """Arial at the given size, or PIL's default font when it isn't installed; one shared font per size"""
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+@functools.lru_cache(maxsize=4096)
+def label_sprite(font_size, text, color):
+    """Label text on its colored, white-outlined background, rasterized once and then pasted for every reuse
+    (the '#N' labels repeat for every device and audit).
+    Returns (sprite, (dx, dy), (text_w, text_h)): the RGB image, its offset from the text position and the text size."""
+    font = load_font(font_size)
+    try:
+        left, top, right, bottom = font.getbbox(text)
+    except Exception:
+        # Fallback if getbbox not available
         try:
-            self.model = YOLO(model_path)
+            left, top, (right, bottom) = 0, 0, font.getsize(text)
+        except Exception:
+            left, top, right, bottom = 0, 0, 32, 18
+    # Background padded 3px left/right and 2px top/bottom around the text
+    sprite = Image.new("RGB", (right - left + 7, bottom - top + 5), color)
+    sprite_draw = ImageDraw.Draw(sprite)
+    sprite_draw.rectangle([0, 0, sprite.width - 1, sprite.height - 1], fill=color, outline="white", width=1)
+    sprite_draw.text((3 - left, 2 - top), text, fill="white", font=font)
+    return sprite, (left - 3, top - 2), (right - left, bottom - top)
+
+def resolve_model_path(model_path):
+    """Prefer a TensorRT FP16 engine next to a .pt checkpoint when a CUDA GPU and TensorRT are available,
+    exporting it once if it doesn't exist yet"""
+    root, ext = os.path.splitext(model_path)
+    if ext != ".pt":
+        return model_path
+    try:
+        import torch
+        import tensorrt  # noqa: F401
+    except ImportError:
+        return model_path
+    if not torch.cuda.is_available():
+        return model_path
+    engine_path = root + ".engine"
+    if os.path.exists(engine_path):
+        return engine_path
+    try:
+        print(f"⚙️ Exporting TensorRT FP16 engine: {engine_path}...")
+        # dynamic batch so the batched segment predict can reuse the same engine
+        return YOLO(model_path).export(format="engine", half=True, dynamic=True, batch=16, verbose=False)
+    except Exception as e:
+        print(f"⚠️ TensorRT export failed, using PyTorch weights: {e}")
+        return model_path
+
+def load_model(model_path):
+    """YOLO detector for model_path, using its TensorRT engine when possible (see resolve_model_path).
+    Returns (model, path actually loaded); falls back to the .pt weights if the engine can't be loaded."""
+    resolved_path = resolve_model_path(model_path)
+    if resolved_path != model_path:
+        print(f"🧠 Loading model: {resolved_path}...")
+        try:
+            model = YOLO(resolved_path, task="detect")
+            # Engines are deserialized on first predict; do it now so a stale engine (built for another
+            # GPU or TensorRT version) fails here rather than mid-audit
+            model.predict(np.zeros((64, 64, 3), dtype=np.uint8), verbose=False)
+            return model, resolved_path
         except Exception as e:
-            print(f"❌ Error loading model: {e}")
-            raise e
+            print(f"⚠️ Could not load TensorRT engine, using PyTorch weights: {e}")
+    print(f"🧠 Loading model: {model_path}...")
+    try:
+        return YOLO(model_path, task="detect"), model_path
+    except Exception as e:
+        print(f"❌ Error loading model: {e}")
+        raise e
+
+class AccessAuditor:
+    def __init__(self, model_path="best.pt", debug=False):
+        """debug: also write the pre-dedup detection image and print browser state (AV_DEBUG=1 turns it on too)"""
+        self.debug = debug or bool(os.environ.get("AV_DEBUG"))
+        # Chrome is started lazily, one per auditing thread, and reused across devices (see _get_driver)
+        self._drivers = {}
+        self._default_user_agent = None
+        # The YOLO predictor is not thread-safe: device threads share the model and take turns predicting
+        self._predict_lock = threading.Lock()
+        self.model, self.model_path = load_model(model_path)
+
+    def _get_driver(self):
+        """Return this thread's headless Chrome driver, starting it on first use"""
+        driver = self._drivers.get(threading.get_ident())
+        if driver is None:
+            driver = launch_chrome()
+            self._default_user_agent = driver.execute_script("return navigator.userAgent")
+            self._drivers[threading.get_ident()] = driver
+        return driver
+
+    def _emulate_device(self, driver, device):
+        """Switch the shared driver to a device viewport via CDP instead of launching a new Chrome"""
+        width, height, pixel_ratio, user_agent = DEVICE_PROFILES.get(device, DEVICE_PROFILES['desktop'])
+        mobile = device in ('mobile', 'ipad')
+        driver.execute_cdp_cmd('Emulation.setDeviceMetricsOverride', {
+            'width': width,
+            'height': height,
+            'deviceScaleFactor': pixel_ratio,
+            'mobile': mobile
+        })
+        driver.execute_cdp_cmd('Emulation.setTouchEmulationEnabled', {'enabled': mobile})
+        driver.execute_cdp_cmd('Network.setUserAgentOverride', {'userAgent': user_agent or self._default_user_agent})
+
+    def _close_driver(self):
+        """Quit this thread's Chrome driver (if running)"""
+        driver = self._drivers.pop(threading.get_ident(), None)
+        if driver is not None:
+            driver.quit()
+
+    def close(self):
+        """Quit every Chrome driver this auditor started"""
+        drivers, self._drivers = self._drivers, {}
+        for driver in drivers.values():
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"⚠️ Failed to quit Chrome: {e}")
+
+    @staticmethod
+    def _device_result(findings, annotated_path, annotated_jpg_path, screenshot_path):
+        return {
+            'findings': findings,
+            'annotated_path': annotated_path,
+            'annotated_jpg_path': annotated_jpg_path,
+            'screenshot': screenshot_path
+        }
 
     def audit_url(self, url, output_folder="audit_results", progress_callback=None, devices=None, audit_id=None):
         """Audit a URL across multiple device viewports. Returns a dict mapping device -> {findings, img_path}.
         By default audits ['desktop','ipad','mobile'].
         audit_id: optional unique identifier for this audit (used in filenames to prevent overwriting).
+        Devices are audited concurrently on threads (each driving its own Chrome, all sharing the loaded
+        model) when enough CPU cores are available, otherwise one after another on the calling thread.
         """
         if devices is None:
             devices = ['desktop', 'ipad', 'mobile']
 
+        total = len(devices)
+        # Leave half the cores for Chrome itself
+        max_workers = min(total, (os.cpu_count() or 1) // 2)
+        if max_workers > 1:
+            return self._audit_devices_parallel(url, devices, output_folder, progress_callback, audit_id, max_workers)
+
         results = {}
+        try:
+            for idx, device in enumerate(devices):
+                # Wrap the progress_callback so per-device progress [0..1] maps to overall progress
+                def make_device_progress(idx_local):
+                    def device_progress(message, pct):
+                        # pct expected in [0..1]; map to overall fraction
+                        overall = (idx_local + pct) / total
+                        if progress_callback:
+                            progress_callback(f"[{device.upper()}] {message}", overall)
+                    return device_progress
+
+                device_progress_cb = make_device_progress(idx)
+                device_output = self._audit_for_device(url, device, output_folder=output_folder, progress_callback=device_progress_cb, audit_id=audit_id)
+                # After device completes, ensure progress is set to the device boundary
+                if progress_callback:
+                    progress_callback(f"Completed {device} audit", float(idx + 1) / total)
+
+                results[device] = self._device_result(*device_output)
+        finally:
+            self.close()
+        return results
+
+    def _audit_devices_parallel(self, url, devices, output_folder, progress_callback, audit_id, max_workers):
+        """Run _audit_for_device for each device on its own thread; progress is marshalled back through a queue.
+        Page loads and waits are spent in Chrome and inference releases the GIL, so threads overlap the work
+        without loading the model again."""
         total = len(devices)
-        for idx, device in enumerate(devices):
-            # Wrap the progress_callback so per-device progress [0..1] maps to overall progress
-            def make_device_progress(idx_local):
-                def device_progress(message, pct):
-                    # pct expected in [0..1]; map to overall fraction
-                    overall = (idx_local + pct) / total
-                    if progress_callback:
-                        progress_callback(f"[{device.upper()}] {message}", overall)
-                return device_progress
-
-            device_progress_cb = make_device_progress(idx)
-            findings, annotated_path, screenshot_path = self._audit_for_device(url, device, output_folder=output_folder, progress_callback=device_progress_cb, audit_id=audit_id)
-            # After device completes, ensure progress is set to the device boundary
+        device_pct = {device: 0.0 for device in devices}
+        results = {}
+        progress_queue = queue.Queue()
+
+        def report(message):
             if progress_callback:
-                progress_callback(f"Completed {device} audit", float(idx + 1) / total)
+                progress_callback(message, sum(device_pct.values()) / total)
 
-            results[device] = {
-                'findings': findings,
-                'annotated_path': annotated_path,
-                'screenshot': screenshot_path
-            }
-        return results
+        # Every shared native routine called from these threads (the model behind _predict_lock, the numba
+        # kernels, Pillow/NumPy) must be threadsafe: no parallel=True kernels, whose fallback threading layer
+        # aborts the whole process on concurrent launches
+        def audit_device(device):
+            # progress_callback may only be safe on the calling thread (e.g. Streamlit), so just enqueue
+            def device_progress(message, pct):
+                progress_queue.put((device, message, pct))
+            return self._audit_for_device(url, device, output_folder=output_folder, progress_callback=device_progress, audit_id=audit_id)
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                device_futures = {pool.submit(audit_device, device): device for device in devices}
+                pending = set(device_futures)
+                while pending:
+                    done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                    while True:
+                        try:
+                            device, message, pct = progress_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        device_pct[device] = pct
+                        report(f"[{device.upper()}] {message}")
+                    for future in done:
+                        device = device_futures[future]
+                        results[device] = self._device_result(*future.result())
+                        device_pct[device] = 1.0
+                        report(f"Completed {device} audit")
+        finally:
+            self.close()
+
+        # Keep the requested device order
+        return {device: results[device] for device in devices}
 
     def _audit_for_device(self, url, device, output_folder="audit_results", progress_callback=None, audit_id=None):
-        """Audit a single device viewport (internal helper). Returns (findings, annotated_path, screenshot_path)."""
-        if not os.path.exists(output_folder): 
-            os.makedirs(output_folder)
+        """Audit a single device viewport (internal helper). Returns (findings, annotated_path, annotated_jpg_path, screenshot_path)."""
+        os.makedirs(output_folder, exist_ok=True)
 
         def update_progress(message, percent):
             msg = f"[{device.upper()}] {message}"
@@ -69,58 +731,23 @@ class AccessAuditor:
         id_suffix = f"_{audit_id}" if audit_id else ""
         screenshot_path = f"{output_folder}/screenshot_{device}{id_suffix}.png"
         annotated_path = f"{output_folder}/annotated_{device}{id_suffix}.png"
+        annotated_jpg_path = f"{output_folder}/annotated_{device}{id_suffix}.jpg"
 
-        # Map device to initial window size (width,height)
-        device_sizes = {
-            'desktop': (1280, 800),
-            'ipad': (768, 1024),
-            'mobile': (390, 844),
-        }
-        initial_size = device_sizes.get(device, (1280, 800))
-
-        # Setup Chrome options
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument(f"--window-size={initial_size[0]},{initial_size[1]}")
-
-        # For mobile/iPad, enable Chrome DevTools mobile emulation for accurate device
-        # metrics (viewport, devicePixelRatio) and touch support. This provides closer
-        # fidelity than setting user-agent alone.
-        if device in ('mobile', 'ipad'):
-            # Choose common device metrics and user-agent for iPhone 13 Pro / iPad Pro
-            if device == 'mobile':
-                ua = "Mozilla/5.0 (iPhone; CPU iPhone OS 15_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.0 Mobile/15E148 Safari/604.1"
-                device_metrics = { 'width': initial_size[0], 'height': initial_size[1], 'pixelRatio': 3 }
-            else:
-                ua = "Mozilla/5.0 (iPad; CPU OS 15_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.0 Mobile/15E148 Safari/604.1"
-                device_metrics = { 'width': initial_size[0], 'height': initial_size[1], 'pixelRatio': 2 }
-
-            mobile_emulation = {
-                'deviceMetrics': device_metrics,
-                'userAgent': ua
-            }
-            chrome_options.add_experimental_option('mobileEmulation', mobile_emulation)
-        
-        # Initialize driver
-        # Try to use system chromium-driver first (for Streamlit Cloud), fall back to ChromeDriverManager
-        try:
-            # Streamlit Cloud: use system chromium
-            chrome_options.binary_location = "/usr/bin/chromium"
-            service = Service("/usr/bin/chromedriver")
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-        except:
-            # Local development: use ChromeDriverManager
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
+        driver = self._get_driver()
+        self._emulate_device(driver, device)
         
         try:
             driver.get(url)
             
-            # Wait for page to load and network to be idle (handles lazy loading)
-            time.sleep(2)
+            # Make native lazy-loaded images start loading now (during the waits below) instead of
+            # scrolling the page step by step; Page.captureScreenshot(captureBeyondViewport) then
+            # renders the whole page in one pass
+            driver.execute_script("""
+                document.querySelectorAll('img[loading="lazy"], iframe[loading="lazy"]').forEach((el) => { el.loading = 'eager'; });
+            """)
+            
+            # Wait for page to load (event-based instead of a fixed sleep), then for network idle
+            WebDriverWait(driver, 10).until(lambda d: d.execute_script("return document.readyState") == "complete")
             
             # Wait for network idle - no pending requests for 1 second
             print("⏳ Waiting for lazy-loaded content (network idle)...")
@@ -165,35 +792,17 @@ class AccessAuditor:
             """)
             print("✅ Network idle or timeout reached")
             
-            # Trigger lazy loading by scrolling through the page
-            print("📜 Scrolling through page to trigger lazy-loaded images...")
-            total_height = driver.execute_script("return document.body.scrollHeight")
-            viewport_height = driver.execute_script("return window.innerHeight")
-            
-            # Scroll in steps to trigger lazy loading
-            scroll_position = 0
-            while scroll_position < total_height:
-                driver.execute_script(f"window.scrollTo(0, {scroll_position});")
-                time.sleep(0.3)  # Wait for images to start loading
-                scroll_position += viewport_height
-            
-            # Scroll back to top
-            driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(1)  # Wait for any final images to finish
-            print("✅ Lazy loading triggered")
-            
-            # Get full page dimensions
-            total_height = driver.execute_script("return document.body.scrollHeight")
-            viewport_height = driver.execute_script("return window.innerHeight")
-            viewport_width = driver.execute_script("return window.innerWidth")
+            # Page dimensions AND every interactive DOM element in one CDP round trip (see _DOM_QUERY_SCRIPT)
+            page_data = driver.execute_cdp_cmd('Runtime.evaluate', {'expression': _DOM_QUERY_SCRIPT, 'returnByValue': True, 'awaitPromise': True})
+            if 'exceptionDetails' in page_data:
+                raise RuntimeError(f"Page query failed: {page_data['exceptionDetails'].get('text')}")
+            page_data = page_data['result']['value']
+            total_height, viewport_height, viewport_width = page_data['dims']
             
             update_progress(f"📏 Page height: {total_height}px, Viewport: {viewport_width}x{viewport_height}px", 0.10)
             
             # Use Chrome DevTools Protocol to capture full-page screenshot properly
             # This avoids window size limits and stitching issues (sticky elements)
-            driver.execute_script("window.scrollTo(0, 0)")
-            time.sleep(0.5)
-            
             # Get page metrics for CDP screenshot
             metrics = driver.execute_cdp_cmd('Page.getLayoutMetrics', {})
             content_size = metrics['contentSize']
@@ -219,9 +828,6 @@ class AccessAuditor:
             
             update_progress(f"✅ Full-page screenshot captured: {screenshot_path}", 0.15)
             
-            # DON'T restore window size yet - we need it at full-page size for DOM queries
-            # (so DOM coordinates match YOLO coordinates from the full-page screenshot)
-            
             # Now segment the full screenshot and run model on each segment
             full_img = Image.open(screenshot_path)
             actual_width, actual_height = full_img.size
@@ -230,570 +836,180 @@ class AccessAuditor:
             # Segment into viewport-sized chunks with OVERLAP to avoid splitting elements
             segment_height = viewport_height
             overlap = 100  # 100px overlap to catch elements at boundaries
-            all_detections = []
-            segment_num = 0
-            
-            # Calculate total segments for progress
-            total_segments = 0
-            y_test = 0
-            while y_test < actual_height:
-                total_segments += 1
-                y_test += segment_height - overlap
-                if y_test + overlap >= actual_height:
-                    break
             
-            y_offset = 0
-            while y_offset < actual_height:
-                segment_end = min(y_offset + segment_height, actual_height)
-                
-                # Crop segment
-                segment = full_img.crop((0, y_offset, actual_width, segment_end))
-                
-                # Save temporary segment
-                temp_segment_path = f"{output_folder}/temp_segment_{segment_num}.png"
-                segment.save(temp_segment_path)
-                
-                # Run YOLO on this segment
-                progress_pct = 0.20 + (segment_num / total_segments) * 0.40  # 20-60% for scanning
-                update_progress(f"🔍 Scanning segment {segment_num + 1}/{total_segments} (y={y_offset}-{segment_end}px)...", progress_pct)
-                segment_results = self.model.predict(temp_segment_path, conf=0.25, verbose=False)
-                
-                # Store detections with adjusted Y coordinates
-                for box in segment_results[0].boxes:
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                    conf = float(box.conf[0])
-                    cls_id = int(box.cls[0])
-                    label = self.model.names[cls_id]
-                    
-                    # Adjust Y coordinates to full-page coordinates
-                    adjusted_y1 = y1 + y_offset
-                    adjusted_y2 = y2 + y_offset
-                    
-                    # Skip detections in overlap regions if not the first segment
-                    # (avoid duplicates from overlapping areas)
-                    if segment_num > 0 and y1 < overlap:
-                        continue  # This element was already captured in previous segment
-                    
-                    all_detections.append({
-                        'x1': x1,
-                        'y1': adjusted_y1,
-                        'x2': x2,
-                        'y2': adjusted_y2,
-                        'conf': conf,
-                        'cls_id': cls_id,
-                        'label': label,
-                        'segment': segment_num
-                    })
-                
-                # Clean up temp segment
-                os.remove(temp_segment_path)
-                segment_num += 1
-                
-                # Move to next segment with overlap
-                y_offset += segment_height - overlap
-                if y_offset + overlap >= actual_height and segment_end == actual_height:
-                    break  # Don't create unnecessary tiny segment at end
+            # Phase 1: decode the page once and take each segment as a row slice (zero-copy view).
+            # Ultralytics reads numpy input as BGR (OpenCV order), so flip channels once for the whole page.
+            full_bgr = np.ascontiguousarray(np.asarray(full_img.convert("RGB"))[:, :, ::-1])
+            segments = [(y_offset, segment_end, full_bgr[y_offset:segment_end])
+                        for y_offset, segment_end in segment_bounds(actual_height, segment_height, overlap)]
+            total_segments = len(segments)
             
-            update_progress(f"🎯 Found {len(all_detections)} detections, removing duplicates...", 0.60)
+            # Phase 2: run YOLO on batches of segments (one predict call per batch instead of per segment)
+            batch_size = 16
+            segment_results = []
+            for batch_start in range(0, total_segments, batch_size):
+                batch = segments[batch_start:batch_start + batch_size]
+                progress_pct = 0.20 + (batch_start / total_segments) * 0.40  # 20-60% for scanning
+                update_progress(f"🔍 Scanning segments {batch_start + 1}-{batch_start + len(batch)}/{total_segments} (y={batch[0][0]}-{batch[-1][1]}px)...", progress_pct)
+                with self._predict_lock:
+                    segment_results.extend(self.model.predict([segment for _, _, segment in batch], conf=0.25, verbose=False, batch=len(batch)))
             
-            # Save image with ALL detections BEFORE deduplication for debugging
-            debug_img = Image.open(screenshot_path).copy()
-            draw = ImageDraw.Draw(debug_img)
-            try:
-                font = ImageFont.truetype("arial.ttf", 14)
-            except:
-                font = ImageFont.load_default()
+            # Phase 3: store detections as columns (struct of arrays) with adjusted Y coordinates
+            box_parts, conf_parts, cls_parts, segment_parts, segment_y1_parts = [], [], [], [], []
+            for segment_num, ((y_offset, _, _), result) in enumerate(zip(segments, segment_results)):
+                # One device->host copy per tensor instead of per-box scalar reads
+                xyxy = result.boxes.xyxy.cpu().numpy().astype(int)
+                segment_y1_parts.append(xyxy[:, 1].copy())  # y1 within its own segment, for the overlap filter
+                
+                # Adjust Y coordinates to full-page coordinates
+                xyxy[:, [1, 3]] += y_offset
+                box_parts.append(xyxy)
+                conf_parts.append(result.boxes.conf.cpu().numpy())
+                cls_parts.append(result.boxes.cls.cpu().numpy().astype(int))
+                segment_parts.append(np.full(len(xyxy), segment_num))
+            det_boxes, det_conf, det_cls, det_segment, det_segment_y1 = (
+                np.concatenate(parts) for parts in (box_parts, conf_parts, cls_parts, segment_parts, segment_y1_parts)
+            )
             
-            for i, det in enumerate(all_detections, 1):
-                # Draw bbox
-                draw.rectangle([det['x1'], det['y1'], det['x2'], det['y2']], 
-                              outline='red', width=2)
-                # Label with number
-                draw.text((det['x1'], det['y1']-15), f"#{i} {det['label']}", 
-                         fill='red', font=font)
+            # Skip detections in overlap regions if not the first segment
+            # (avoid duplicates from overlapping areas: already captured in the previous segment)
+            keep = ~((det_segment > 0) & (det_segment_y1 < overlap))
+            det_boxes, det_conf, det_cls = det_boxes[keep], det_conf[keep], det_cls[keep]
+            class_names = np.array([self.model.names[i] for i in range(len(self.model.names))])
+            det_labels = class_names[det_cls]
             
-            debug_img.save(os.path.join(output_folder, f"all_detections_before_dedup_{device}{id_suffix}.png"))
-            print(f"💾 Saved all {len(all_detections)} raw detections to all_detections_before_dedup_{device}{id_suffix}.png")
+            update_progress(f"🎯 Found {len(det_boxes)} detections, removing duplicates...", 0.60)
+            
+            # Save image with ALL detections BEFORE deduplication for debugging
+            # (debug mode only; skipped by default to avoid a second full-page PNG encode)
+            if self.debug:
+                debug_img = full_img.copy()
+                draw = ImageDraw.Draw(debug_img)
+                for i, ((x1, y1, x2, y2), label) in enumerate(zip(det_boxes.tolist(), det_labels), 1):
+                    # Draw bbox
+                    draw.rectangle([x1, y1, x2, y2], outline='red', width=2)
+                    # Label with number
+                    draw.text((x1, y1-15), f"#{i} {label}", fill='red', font=load_font(14))
+                
+                debug_img.save(os.path.join(output_folder, f"all_detections_before_dedup_{device}{id_suffix}.png"))
+                print(f"💾 Saved all {len(det_boxes)} raw detections to all_detections_before_dedup_{device}{id_suffix}.png")
             
             # Deduplicate detections using IoU (Intersection over Union)
-            # Sort by area (smallest first) - tighter boxes are more accurate than loose ones
-            all_detections.sort(key=lambda d: (d['x2'] - d['x1']) * (d['y2'] - d['y1']))
+            print(f"\n🔍 Deduplication: Starting with {len(det_boxes)} detections")
+            kept = deduplicate_detections(det_boxes, det_labels, det_conf)
+            det_boxes = det_boxes[kept]
             
-            print(f"\n🔍 Deduplication: Starting with {len(all_detections)} detections")
-            deduplicated = []
+            print(f"✅ After deduplication: {len(kept)} unique elements")
             
-            for detection in all_detections:
-                is_duplicate = False
-                
-                # Check if this detection significantly overlaps with any already-kept detection
-                for kept in deduplicated:
-                    x1a, y1a, x2a, y2a = detection['x1'], detection['y1'], detection['x2'], detection['y2']
-                    x1b, y1b, x2b, y2b = kept['x1'], kept['y1'], kept['x2'], kept['y2']
-                    
-                    # Calculate intersection
-                    inter_x1 = max(x1a, x1b)
-                    inter_y1 = max(y1a, y1b)
-                    inter_x2 = min(x2a, x2b)
-                    inter_y2 = min(y2a, y2b)
-                    
-                    if inter_x2 > inter_x1 and inter_y2 > inter_y1:
-                        inter_area = (inter_x2 - inter_x1) * (inter_y2 - inter_y1)
-                        area_a = (x2a - x1a) * (y2a - y1a)
-                        area_b = (x2b - x1b) * (y2b - y1b)
-                        
-                        # TWO-WAY overlap check: both boxes must overlap >80% with each other
-                        # This prevents child elements (button in input) from being deduplicated
-                        overlap_a = inter_area / area_a  # How much of box A overlaps with B
-                        overlap_b = inter_area / area_b  # How much of box B overlaps with A
-                        
-                        # Standard two-way check (works for all cases)
-                        if overlap_a > 0.8 and overlap_b > 0.8:
-                            is_duplicate = True
-                            print(f"  🔄 Skipping duplicate {detection['label']} at ({detection['x1']},{detection['y1']})-({detection['x2']},{detection['y2']}) [conf={detection['conf']:.2f}] - overlaps {overlap_a*100:.0f}%/{overlap_b*100:.0f}% with {kept['label']}")
-                            break
-                        
-                        # SAME CLASS special case: If same element type with bbox variance,
-                        # use one-way check (smaller box >80% inside larger box)
-                        # Use EITHER center proximity OR size similarity to confirm it's the same element
-                        if detection['label'] == kept['label']:
-                            smaller_area = min(area_a, area_b)
-                            larger_area = max(area_a, area_b)
-                            area_ratio = larger_area / smaller_area
-                            
-                            # Calculate center distance
-                            center_a_x = (x1a + x2a) / 2
-                            center_a_y = (y1a + y2a) / 2
-                            center_b_x = (x1b + x2b) / 2
-                            center_b_y = (y1b + y2b) / 2
-                            center_dist = ((center_a_x - center_b_x)**2 + (center_a_y - center_b_y)**2)**0.5
-                            
-                            # Deduplicate if smaller >80% inside larger AND either:
-                            # - Centers very close (<10px) - same element, different bbox
-                            # - Similar size (<2x ratio) - slight bbox variance
-                            if inter_area / smaller_area > 0.8 and (center_dist < 10 or area_ratio < 2):
-                                is_duplicate = True
-                                print(f"  🔄 Skipping duplicate {detection['label']} at ({detection['x1']},{detection['y1']})-({detection['x2']},{detection['y2']}) [conf={detection['conf']:.2f}] - same class, {inter_area/smaller_area*100:.0f}% overlap, {center_dist:.0f}px apart, {area_ratio:.1f}x size")
-                                break
-                
-                if not is_duplicate:
-                    deduplicated.append(detection)
-            
-            print(f"✅ After deduplication: {len(deduplicated)} unique elements")
-            
-            all_detections = deduplicated
-            update_progress(f"✅ After deduplication: {len(all_detections)} unique elements", 0.65)
-            
-            # === NEW APPROACH: Query ALL interactive elements upfront ===
-            update_progress("🔍 Querying all interactive elements from DOM...", 0.68)
-            
-            # Keep window at full-page size and scroll to top for consistent coordinate system
-            # (YOLO coordinates are in full-page screenshot space, so DOM must match)
-            driver.execute_script("window.scrollTo(0, 0)")
-            time.sleep(0.1)
-            
-            print(f"🔍 DEBUG: Current window size: {driver.get_window_size()}")
-            print(f"🔍 DEBUG: Current scroll position: {driver.execute_script('return [window.pageYOffset, window.pageXOffset]')}")
-            
-            # First, test if basic JavaScript execution works
-            test_result = driver.execute_script("return 'JavaScript works!';")
-            print(f"🔍 DEBUG: JS test result: {test_result}")
-            
-            # Test basic DOM query
-            test_buttons = driver.execute_script("return document.querySelectorAll('button').length;")
-            print(f"🔍 DEBUG: Number of <button> tags: {test_buttons}")
-            
-            all_dom_elements_script = """
-                try {
-                    console.log('Starting DOM query...');
-                    const selectors = [
-                        'button',
-                        'a',
-                        'input',
-                        'textarea',
-                        'select',
-                        'img',  // Include images for visual-only detections
-                        '[role="button"]',
-                        '[role="link"]',
-                        '[onclick]',
-                        '[tabindex]:not([tabindex="-1"])'
-                    ];
-                    console.log('Selectors:', selectors);
-                    
-                    const elements = document.querySelectorAll(selectors.join(','));
-                    console.log('Found elements:', elements.length);
-                    const elementList = [];
-                    
-                    const dpr = window.devicePixelRatio || 1;
-                    for (let el of elements) {
-                        // Skip invisible elements
-                        const style = window.getComputedStyle(el);
-                        if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') {
-                            continue;
-                        }
-                        
-                        const rect = el.getBoundingClientRect();
-                        
-                        // Skip elements with no size
-                        if (rect.width === 0 || rect.height === 0) continue;
-                        
-                        // Calculate absolute position (accounting for scroll) and scale to device pixels
-                        const scrollY = window.pageYOffset || document.documentElement.scrollTop;
-                        const scrollX = window.pageXOffset || document.documentElement.scrollLeft;
-
-                        // Multiply CSS pixels by devicePixelRatio so coordinates align with screenshot pixels
-                        elementList.push({
-                            tagName: el.tagName,
-                            role: el.getAttribute('role'),
-                            ariaLabel: el.getAttribute('aria-label'),
-                            title: el.getAttribute('title'),
-                            alt: el.getAttribute('alt'),
-                            innerText: (el.innerText || "").substring(0, 100),
-                            html: el.outerHTML.substring(0, 500),
-                            textDecoration: style.textDecorationLine,
-                            x: Math.round((rect.left + scrollX) * dpr),
-                            y: Math.round((rect.top + scrollY) * dpr),
-                            width: Math.round(rect.width * dpr),
-                            height: Math.round(rect.height * dpr)
-                        });
-                    }
-                    
-                    console.log('Returning elementList:', elementList.length);
-                    return elementList;
-                } catch (error) {
-                    console.error('Error in DOM query:', error);
-                    return [];
-                }
-            """
+            # Per-element geometry as flat columns (struct of arrays), indexed by position in the loop below
+            det_conf, det_labels = det_conf[kept], det_labels[kept]
+            det_w = det_boxes[:, 2] - det_boxes[:, 0]
+            det_h = det_boxes[:, 3] - det_boxes[:, 1]
+            det_cx = (det_boxes[:, 0] + det_boxes[:, 2]) / 2
+            det_cy = (det_boxes[:, 1] + det_boxes[:, 3]) / 2
+            n_elements = len(det_boxes)
+            update_progress(f"✅ After deduplication: {n_elements} unique elements", 0.65)
             
-            try:
-                all_dom_elements = driver.execute_script(all_dom_elements_script)
-                if all_dom_elements is None:
-                    all_dom_elements = []
-                    print("⚠️ Warning: DOM query returned None, falling back to empty list")
-                print(f"🔍 DEBUG: DOM query returned {len(all_dom_elements)} elements")
-                if len(all_dom_elements) > 0:
-                    print(f"🔍 DEBUG: First element sample: {all_dom_elements[0]}")
-                update_progress(f"✅ Found {len(all_dom_elements)} interactive elements in DOM", 0.70)
-                
-            except Exception as e:
-                print(f"⚠️ Error querying DOM elements: {e}")
-                import traceback
-                traceback.print_exc()
-                all_dom_elements = []
+            # === NEW APPROACH: ALL interactive elements were queried upfront (with the page dimensions) ===
+            all_dom_elements = page_data['elements'] or []
+            if page_data['domError']:
+                print(f"⚠️ Error querying DOM elements: {page_data['domError']}")
                 update_progress(f"⚠️ DOM query failed, proceeding with visual-only analysis", 0.70)
+            else:
+                if self.debug:
+                    print(f"🔍 DEBUG: Window size: {page_data['windowSize']}, scroll position: {page_data['scroll']}")
+                    print(f"🔍 DEBUG: DOM query returned {len(all_dom_elements)} elements")
+                    if len(all_dom_elements) > 0:
+                        print(f"🔍 DEBUG: First element sample: {all_dom_elements[0]}")
+                update_progress(f"✅ Found {len(all_dom_elements)} interactive elements in DOM", 0.70)
             
-            # Helper function: Calculate IoU (Intersection over Union)
-            def calculate_iou(box1, box2):
-                """Calculate IoU between YOLO detection and DOM element"""
-                x1_min, y1_min, x1_max, y1_max = box1
-                x2_min, y2_min, x2_max, y2_max = box2
-                
-                # Calculate intersection
-                inter_x_min = max(x1_min, x2_min)
-                inter_y_min = max(y1_min, y2_min)
-                inter_x_max = min(x1_max, x2_max)
-                inter_y_max = min(y1_max, y2_max)
-                
-                if inter_x_max < inter_x_min or inter_y_max < inter_y_min:
-                    return 0.0
-                
-                inter_area = (inter_x_max - inter_x_min) * (inter_y_max - inter_y_min)
-                box1_area = (x1_max - x1_min) * (y1_max - y1_min)
-                box2_area = (x2_max - x2_min) * (y2_max - y2_min)
-                union_area = box1_area + box2_area - inter_area
-                
-                return inter_area / union_area if union_area > 0 else 0.0
+            # DOM geometry as one array, built once for all detections
+            dom_boxes = dom_box_array(all_dom_elements)
             
             # Process all detections
-            update_progress(f"🔍 Matching {len(all_detections)} visual elements to DOM...", 0.72)
-            img = Image.open(screenshot_path).convert("RGB")
+            update_progress(f"🔍 Matching {n_elements} visual elements to DOM...", 0.72)
+            img = full_img.convert("RGB")
+            img_width = img.width
             draw = ImageDraw.Draw(img)
             
-            # Prepare font for labels (use default if custom not available)
-            try:
-                label_font = ImageFont.truetype("arial.ttf", 16)
-                small_font = ImageFont.truetype("arial.ttf", 12)
-            except:
-                label_font = ImageFont.load_default()
-                small_font = ImageFont.load_default()
+            # Overlap (#6) and spacing (#7) between every pair of elements, computed in one pass. Spacing is only
+            # checked for buttons and links; the DOM correction swaps those two labels but never adds or drops one
+            overlaps_other, nearest_edge_distance = layout_conflicts(det_boxes, max_gap=8,
+                                                                     interactive=label_in(det_labels, CLICKABLE_LABELS))
+            
+            # Best IoU and closest-center DOM match for every detection, computed in one pass
+            best_dom_idx, best_ious, closest_dom_idx, closest_dists = match_dom_elements(det_boxes, dom_boxes)
+            
+            dom_match_idx, matched_by_iou = select_dom_matches(best_dom_idx, best_ious, closest_dom_idx, closest_dists)
+            
+            # All WCAG checks for all elements in one vectorized pass; the loop below only reports and draws
+            element_rules, actual_labels = classify_elements(det_labels, det_w, det_h, dom_match_idx, all_dom_elements,
+                                                             overlaps_other, nearest_edge_distance)
+            
+            # Label jitter along the element border; seeded so re-running an audit draws the same image
+            randint = random.Random(0).randint
+            
+            outlines = {status: [] for status in STATUS_COLORS}
+            label_draws = []
             
-            for elem_idx, detection in enumerate(all_detections):
+            element_columns = zip(det_boxes.tolist(), det_w.tolist(), det_h.tolist(), det_cx.tolist(), det_cy.tolist(),
+                                  det_conf.tolist(), det_labels.tolist())
+            for elem_idx, ((x1, y1, x2, y2), w_px, h_px, cx, cy, conf, label) in enumerate(element_columns):
                 # Update progress periodically
                 if elem_idx % 10 == 0:  # Update every 10 elements
-                    progress_pct = 0.72 + (elem_idx / len(all_detections)) * 0.23  # 72-95%
-                    update_progress(f"🔍 Analyzing element {elem_idx + 1}/{len(all_detections)}...", progress_pct)
-                    
-                x1, y1, x2, y2 = detection['x1'], detection['y1'], detection['x2'], detection['y2']
-                conf = detection['conf']
-                cls_id = detection['cls_id']
-                label = detection['label']
+                    progress_pct = 0.72 + (elem_idx / n_elements) * 0.23  # 72-95%
+                    update_progress(f"🔍 Analyzing element {elem_idx + 1}/{n_elements}...", progress_pct)
                 
                 # Debug: Print each detection
                 print(f"\n🔍 Detection #{elem_idx+1}: {label} at ({x1},{y1})-({x2},{y2}), conf={conf:.2f}")
                 
-                # Find best matching DOM element based on IoU
-                best_match = None
-                best_iou = 0.0
-                second_best_iou = 0.0
-                
-                yolo_box = (x1, y1, x2, y2)
-                
-                for dom_el in all_dom_elements:
-                    dom_box = (
-                        dom_el['x'],
-                        dom_el['y'],
-                        dom_el['x'] + dom_el['width'],
-                        dom_el['y'] + dom_el['height']
-                    )
-                    
-                    iou = calculate_iou(yolo_box, dom_box)
-                    
-                    if iou > best_iou:
-                        second_best_iou = best_iou
-                        best_iou = iou
-                        best_match = dom_el
-                    elif iou > second_best_iou:
-                        second_best_iou = iou
+                # Matched DOM element (best IoU, else closest center; see select_dom_matches)
+                dom_data = all_dom_elements[dom_match_idx[elem_idx]] if dom_match_idx[elem_idx] >= 0 else None
+                best_iou = float(best_ious[elem_idx])
                 
-                # Lower threshold to 0.1 (10% overlap) to catch more matches
-                # YOLO boxes are often imprecise, especially for text links
-                if best_match and best_iou > 0.1:
-                    dom_data = best_match
+                if matched_by_iou[elem_idx]:
                     if best_iou < 0.3:
-                        print(f"  🔍 Low IoU match ({best_iou:.2f}) for {label} at ({x1},{y1})-({x2},{y2}) → DOM {best_match['tagName']} at ({best_match['x']},{best_match['y']})")
+                        print(f"  🔍 Low IoU match ({best_iou:.2f}) for {label} at ({x1},{y1})-({x2},{y2}) → DOM {dom_data['tagName']} at ({dom_data['x']},{dom_data['y']})")
                 else:
-                    # Fallback: try center-point distance matching
-                    # Sometimes YOLO box is completely off but center is close
-                    yolo_cx = (x1 + x2) / 2
-                    yolo_cy = (y1 + y2) / 2
+                    closest_element = all_dom_elements[closest_dom_idx[elem_idx]] if closest_dom_idx[elem_idx] >= 0 else None
+                    best_distance = float(closest_dists[elem_idx])
                     
-                    best_distance = float('inf')
-                    closest_element = None
-                    
-                    for dom_el in all_dom_elements:
-                        dom_cx = dom_el['x'] + dom_el['width'] / 2
-                        dom_cy = dom_el['y'] + dom_el['height'] / 2
-                        
-                        distance = ((yolo_cx - dom_cx) ** 2 + (yolo_cy - dom_cy) ** 2) ** 0.5
-                        
-                        if distance < best_distance:
-                            best_distance = distance
-                            closest_element = dom_el
-                    
-                    # If center is within 50px, consider it a match
-                    if closest_element and best_distance < 50:
-                        dom_data = closest_element
+                    if dom_data:
                         print(f"  📍 Center-distance match ({best_distance:.0f}px) for {label} at ({x1},{y1}) → DOM {closest_element['tagName']} at ({closest_element['x']},{closest_element['y']})")
                     else:
-                        dom_data = None
-                        print(f"  ❌ NO MATCH for {label} at ({x1},{y1})-({x2},{y2}) size={x2-x1}x{y2-y1}px, conf={conf:.2f}")
+                        print(f"  ❌ NO MATCH for {label} at ({x1},{y1})-({x2},{y2}) size={w_px}x{h_px}px, conf={conf:.2f}")
                         print(f"     Best IoU: {best_iou:.3f}, Closest center: {best_distance:.0f}px")
                         if closest_element:
                             print(f"     Closest DOM: {closest_element['tagName']} at ({closest_element['x']},{closest_element['y']}) size={closest_element['width']}x{closest_element['height']}px")
                             print(f"     Text: '{closest_element.get('innerText', '')[:50]}'")
                 
-                # Calculate center for output
-                cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
-                
-                status = "PASS"
-                issue = ""
-                model_label = label  # Keep original model prediction
-                
-                if not dom_data:
-                    # No DOM match - could be decorative or ghost control
-                    if label in ["Button", "Link"]:
-                        # Looks interactive but isn't in DOM = potential Ghost Control
-                        status = "WARNING"
-                        issue = "Visual element not found in DOM - possible Ghost Control (WCAG 4.1.2)"
-                    else:
-                        # Image or other non-interactive element = likely decorative
-                        status = "PASS"
-                        issue = "Decorative element (visual-only, not interactive)"
+                # WCAG result for this element (first rule it tripped, see classify_elements)
+                rule = element_rules[elem_idx]
+                if rule >= 0:
+                    status, issue = WCAG_RULES[rule]
+                    dom_size = dom_data or {}
+                    issue = issue.format(w=w_px, h=h_px, dom_w=dom_size.get('width', w_px), dom_h=dom_size.get('height', h_px),
+                                         distance=nearest_edge_distance[elem_idx])
                 else:
-                    tag = dom_data.get('tagName', '')
-                    role = dom_data.get('role')
-                    text = (dom_data.get('innerText') or '').strip()
-                    aria = (dom_data.get('ariaLabel') or '').strip()
-                    title = (dom_data.get('title') or '').strip()
-                    alt = (dom_data.get('alt') or '').strip()
-                    
-                    # VISUAL-FIRST APPROACH: The CV model found an interactive element visually.
-                    # Now we verify its DOM implementation. This catches "Ghost Controls" - 
-                    # things that LOOK interactive but aren't coded properly.
-                    # DOM correction is secondary; the visual detection is the innovation.
-                    actual_label = label
-                    corrected = False
-                    if tag == "BUTTON" and label == "Link":
-                        actual_label = "Button"
-                        corrected = True
-                    elif tag == "A" and label == "Button":
-                        actual_label = "Link"
-                        corrected = True
-                    
-                    # --- WCAG CHECKS (Visual + Semantic) ---
-                    # 1. Ghost Controls - VISUAL DETECTION IS KEY HERE
-                    # Code scanners miss this because they only see valid HTML.
-                    # We detect the VISUAL button, then verify semantic correctness.
-                    if actual_label == "Button":
-                        if tag in ["DIV", "SPAN", "IMG"] and role != "button":
-                            status = "FAIL"
-                            issue = "Visual Button coded as <div>/<span> (WCAG 4.1.2)"
-
-                    # 2. Empty Interactive Elements - Check accessible name sources
-                    if actual_label in ["Button", "Link"] and status == "PASS":
-                        # For buttons/links: check text content and aria-label
-                        has_accessible_name = bool(text or aria)
-                        
-                        if not has_accessible_name:
-                            status = "FAIL"
-                            issue = "Interactive element missing accessible name (WCAG 1.1.1)"
-                    
-                    # 2b. Images without alt text
-                    if tag == "IMG" and status == "PASS":
-                        if not alt and not aria:
-                            status = "FAIL"
-                            issue = "Image missing alt text (WCAG 1.1.1)"
-
-                    # 3. Target Size - PURELY VISUAL CHECK
-                    # This is impossible for code scanners - they don't know rendered size.
-                    # We measure actual pixel dimensions from the visual detection.
-                    w_px, h_px = (x2 - x1), (y2 - y1)
-                    
-                    if actual_label in ["Button", "Link", "Input"] and status == "PASS":
-                        # Check if DOM size differs significantly from visual size
-                        if dom_data:
-                            dom_w = dom_data.get('width', w_px)
-                            dom_h = dom_data.get('height', h_px)
-                            
-                            # Calculate size discrepancy
-                            visual_area = w_px * h_px
-                            dom_area = dom_w * dom_h
-                            
-                            # If DOM is significantly larger than visual (>20% larger)
-                            if dom_area > visual_area * 1.2 and visual_area < 1000:
-                                status = "WARNING"
-                                issue = f"Visual size ({w_px}x{h_px}px) much smaller than clickable area ({dom_w}x{dom_h}px) - unclear target (WCAG 2.5.8)"
-                            elif w_px < 24 or h_px < 24:
-                                # Visual target is small
-                                status = "WARNING"
-                                issue = f"Visual target appears small ({w_px}x{h_px}px) - may be hard to click (WCAG 2.5.8)"
-                        elif w_px < 24 or h_px < 24:
-                            # No DOM match, just check visual size
-                            status = "WARNING"
-                            issue = f"Small target size ({w_px}x{h_px}px) - min 24x24px (WCAG 2.5.8)"
-
-                    # 4. Links Color Only - VISUAL VERIFICATION
-                    if actual_label == "Link" and status == "PASS":
-                        if "underline" not in dom_data.get('textDecoration', ''):
-                            status = "WARNING"
-                            issue = "Link relies on color alone (No Underline) (WCAG 1.4.1)"
-                    
-                    # 5. Semantic Mismatch - Link styled as Button
-                    # This catches the anti-pattern where <a> tags are styled to look like buttons.
-                    # Screen readers say "link" but visual users see a "button" - confusing!
-                    if actual_label == "Link" and model_label == "Button" and status == "PASS":
-                        status = "WARNING"
-                        issue = "Link styled as button - screen readers announce 'link' but appears as button (WCAG 1.3.1)"
-                    
-                    # 6. Overlapping Elements - VISUAL PROXIMITY CHECK
-                    # Code scanners can't detect visual collisions
-                    # Check if this element overlaps with previous ones
-                    for i, prev_detection in enumerate(all_detections):
-                        # Skip comparing element with itself
-                        if i == elem_idx:
-                            continue
-                        px1, py1, px2, py2 = prev_detection['x1'], prev_detection['y1'], prev_detection['x2'], prev_detection['y2']
-                        
-                        # Check for overlap
-                        overlap_x = max(0, min(x2, px2) - max(x1, px1))
-                        overlap_y = max(0, min(y2, py2) - max(y1, py1))
-                        overlap_area = overlap_x * overlap_y
-                        
-                        # Calculate areas
-                        this_area = w_px * h_px
-                        prev_area = (px2 - px1) * (py2 - py1)
-                        smaller_area = min(this_area, prev_area)
-                        larger_area = max(this_area, prev_area)
-                        
-                        # Skip parent-child relationships (one element fully inside another)
-                        # This is intentional design (e.g., buttons inside search bar)
-                        # Check if EITHER element is 95%+ contained in the other
-                        overlap_ratio_this = overlap_area / this_area if this_area > 0 else 0
-                        overlap_ratio_prev = overlap_area / prev_area if prev_area > 0 else 0
-                        if overlap_ratio_this >= 0.95 or overlap_ratio_prev >= 0.95:
-                            continue
-                        
-                        # If significant overlap (>30% of smaller element) but NOT parent-child
-                        if smaller_area > 0 and (overlap_area / smaller_area) > 0.3:
-                            if status == "PASS":
-                                status = "WARNING"
-                                issue = f"Overlapping interactive elements - may be hard to click (WCAG 2.5.8)"
-                            break
-                    
-                    # 7. Insufficient Spacing - VISUAL LAYOUT CHECK
-                    # Interactive elements too close together make clicking difficult
-                    # Check distance to nearest interactive element
-                    min_distance = float('inf')
-                    for i, prev_detection in enumerate(all_detections):
-                        # Skip comparing element with itself
-                        if i == elem_idx:
-                            continue
-                        px1, py1, px2, py2 = prev_detection['x1'], prev_detection['y1'], prev_detection['x2'], prev_detection['y2']
-                        
-                        # Calculate center-to-center distance
-                        this_cx, this_cy = (x1 + x2) / 2, (y1 + y2) / 2
-                        prev_cx, prev_cy = (px1 + px2) / 2, (py1 + py2) / 2
-                        distance = ((this_cx - prev_cx)**2 + (this_cy - prev_cy)**2)**0.5
-                        
-                        # Calculate edge-to-edge distance (more relevant)
-                        edge_dist_x = max(0, max(x1, px1) - min(x2, px2))
-                        edge_dist_y = max(0, max(y1, py1) - min(y2, py2))
-                        edge_distance = (edge_dist_x**2 + edge_dist_y**2)**0.5
-                        
-                        min_distance = min(min_distance, edge_distance)
-                    
-                    # Flag if elements are very close (< 8px apart)
-                    if actual_label in ["Button", "Link"] and min_distance < 8 and status == "PASS":
-                        status = "WARNING"
-                        issue = f"Insufficient spacing ({min_distance:.0f}px) to nearby element - recommend 8px+ (WCAG 2.5.8)"
-                    
-                    # 8. Very Large Interactive Elements - VISUAL SIZE CHECK
-                    # Unusually large clickable areas can confuse users
-                    if actual_label in ["Button", "Link"] and status == "PASS":
-                        if w_px > 400 or h_px > 200:
-                            status = "WARNING"
-                            issue = f"Unusually large interactive element ({w_px}x{h_px}px) - may be unintentional"
-                    
-                    # Update label to actual for display
-                    label = actual_label
+                    status, issue = "PASS", ""
+                # Label corrected by the DOM tag, for display
+                label = actual_labels[elem_idx]
 
-                # Draw Results
-                color = "green"
-                if status == "FAIL": color = "red"
-                elif status == "WARNING": color = "orange"
-                
-                draw.rectangle([x1, y1, x2, y2], outline=color, width=3 if status != "PASS" else 2)
+                # Draw Results (queued; drawn after the loop)
+                color = STATUS_COLORS[status]
+                outlines[status].append([x1, y1, x2, y2])
                 
                 # Add numbered label on the image (element index will be its position in findings list)
                 element_number = len(findings) + 1
                 label_text = f"#{element_number}"
 
                 # Smart label positioning: hug the element border and randomize ALONG the border
-                box_width = x2 - x1
-                box_height = y2 - y1
-
-                # Compute text size so we can keep label within image bounds
-                try:
-                    tb = label_font.getbbox(label_text)
-                    label_w = tb[2] - tb[0]
-                    label_h = tb[3] - tb[1]
-                except Exception:
-                    try:
-                        label_w, label_h = label_font.getsize(label_text)
-                    except Exception:
-                        label_w, label_h = 30, 16
-
-                import random
+                box_width = w_px
+                box_height = h_px
+
+                # Label with color-coded background matching the box color; the rendered sprite is cached
+                # per text and color, so drawing it is a paste. Its text size keeps the label within image bounds
+                sprite, (dx, dy), (label_w, label_h) = label_sprite(LABEL_FONT_SIZE, label_text, color)
 
                 # If small element, place label OUTSIDE above the top edge, randomized along top border
                 if box_width < 40 or box_height < 40:
@@ -803,7 +1019,7 @@ class AccessAuditor:
                         # If label wider than box, allow it to start at x1 but clamp later
                         min_x = x1 - (label_w // 2)
                         max_x = x1 + (label_w // 2)
-                    label_x = random.randint(int(min_x), int(max_x))
+                    label_x = randint(int(min_x), int(max_x))
                     label_y = y1 - label_h - 4
                 else:
                     # For larger elements, place label INSIDE along the top edge, randomized horizontally
@@ -812,29 +1028,16 @@ class AccessAuditor:
                     if max_x < min_x:
                         min_x = x1 + 2
                         max_x = x1 + 2
-                    label_x = random.randint(int(min_x), int(max_x))
+                    label_x = randint(int(min_x), int(max_x))
                     label_y = y1 + 2
 
-                # Clamp label position to image boundaries if possible
-                try:
-                    img_width = img.width
-                    label_x = max(0, min(label_x, img_width - label_w))
-                except Exception:
-                    pass
+                # Clamp label position to image boundaries
+                label_x = max(0, min(label_x, img_width - label_w))
                 
-                # Draw label with colored background
-                try:
-                    bbox_result = draw.textbbox((label_x, label_y), label_text, font=label_font)
-                    label_bg = [bbox_result[0]-3, bbox_result[1]-2, bbox_result[2]+3, bbox_result[3]+2]
-                except:
-                    # Fallback if textbbox not available
-                    label_bg = [label_x-3, label_y-2, label_x+35, label_y+20]
+                label_draws.append((sprite, (label_x + dx, label_y + dy)))
                 
-                # Use color-coded background matching the box color
-                draw.rectangle(label_bg, fill=color, outline="white", width=1)
-                draw.text((label_x, label_y), label_text, fill="white", font=label_font)
-                
-                # Add all findings (including PASS) to the report
+                # Add all findings (including PASS) to the report. Plain dicts on purpose: the app reads them
+                # by key and with .get, and one dict display is already CPython's fastest way to build a record
                 findings.append({
                     "type": label,
                     "status": status,
@@ -846,23 +1049,38 @@ class AccessAuditor:
                         "y1": y1,
                         "x2": x2,
                         "y2": y2,
-                        "w": x2 - x1,
-                        "h": y2 - y1,
+                        "w": w_px,
+                        "h": h_px,
                         "center_x": cx,
                         "center_y": cy
                     }
                 })
 
-            img.save(annotated_path)
+            # Box outlines grouped by status - PASS first so problems stay on top - then every label above them
+            for status in ("PASS", "WARNING", "FAIL"):
+                color, width = STATUS_COLORS[status], 3 if status != "PASS" else 2
+                for box in outlines[status]:
+                    draw.rectangle(box, outline=color, width=width)
+            for sprite, label_xy in label_draws:
+                img.paste(sprite, label_xy)
+            
+            # Pillow releases the GIL while encoding, so the PNG is written in a background thread while the
+            # JPEG encodes here. Low zlib effort: the PNG is a local working copy, encode time matters more than size
+            with ThreadPoolExecutor(max_workers=1) as saver:
+                png_saved = saver.submit(img.save, annotated_path, compress_level=1)
+                # Lossy copy for the full-page view (smaller to decode and serve); the PNG stays
+                # the source for highlight compositing where pixel fidelity matters
+                img.save(annotated_jpg_path, "JPEG", quality=85, progressive=True)
+                png_saved.result()
             update_progress("✅ Audit complete! Generating report...", 0.95)
 
         except Exception as e:
             print(f"Error: {e}")
             if progress_callback:
                 progress_callback(f"❌ Error: {e}", 1.0)
-            return [], None, None
-        finally:
-            driver.quit()
+            # Don't hand a driver in an unknown state to the next device
+            self._close_driver()
+            return [], None, None, None
             
         update_progress("✅ Audit complete!", 1.0)
-        return findings, annotated_path, screenshot_path
\ No newline at end of file
+        return findings, annotated_path, annotated_jpg_path, screenshot_path
\ No newline at end of file